@@ -0,0 +1,233 @@
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+from synthetic import HandGenerator
+from libs.gesture_engine import GestureEngine
+from libs.template_bank import TemplateBank
+from libs.input_backend import RecordingBackend
+import libs.action_handler as action_handler
+import libs.config_manager as config_manager
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+MATCH_SIZES = (10, 100, 1000, 10000)
+LIBRARY_SIZES = (100, 1000)
+ALLOC_FRAMES = 500
+ALLOC_PEAK_LIMIT = 64 * 1024
+ALLOC_GROWTH_LIMIT = 4 * 1024
+BUDGETS_US = {"find_matching_gesture.n=10000": 2000.0}
+
+def timeit(fn, min_time=0.2, repeat=5):
+    loops, t = 1, 0.0
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(loops): fn()
+        t = time.perf_counter() - t0
+        if t >= min_time / repeat or loops >= 1 << 20: break
+        loops *= 2 if t == 0 else max(2, min(10, int(min_time / repeat / t) + 1))
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(loops): fn()
+        runs.append((time.perf_counter() - t0) / loops)
+    runs.sort()
+    return {"us": runs[len(runs) // 2] * 1e6, "min_us": runs[0] * 1e6, "loops": loops}
+
+def bench_normalize(gen):
+    engine = GestureEngine(load_model=False)
+    hand = gen.hand(gen.pose())
+    yield "normalize_landmarks", lambda: engine.normalize_landmarks(hand.landmark)
+
+def bench_match(gen):
+    engine = GestureEngine(load_model=False)
+    for n in MATCH_SIZES:
+        protos, gestures = gen.library(n, samples=1)
+        bank = TemplateBank(gestures)
+        queries = [gen.hand(protos[i]) for i in gen.rng.integers(0, n, 64)]
+        state = {"i": 0}
+        def fn(bank=bank, queries=queries, state=state):
+            state["i"] = (state["i"] + 1) % len(queries)
+            return engine.find_matching_gesture(queries[state["i"]], bank, 0.07)
+        bank.cascade = True
+        yield f"find_matching_gesture.n={n}", fn
+        bank.cascade = False
+        yield f"find_matching_gesture.n={n}.no_cascade", fn
+
+def bench_config(gen):
+    old = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="gesture_bench_") as tmp:
+        os.chdir(tmp)
+        try:
+            for n in LIBRARY_SIZES:
+                _, gestures = gen.library(n, samples=8)
+                cfg = config_manager.ConfigManager()
+                for name, samples in gestures.items():
+                    cfg.config["gestures"][name] = samples
+                    cfg.config["profiles"]["GLOBAL"]["actions"][name] = "hotkey:ctrl+c"
+                def save(cfg=cfg):
+                    cfg._mark_dirty(gestures=True)
+                    cfg.flush()
+                save()
+                yield f"config.save.n={n}", save
+                yield f"config.load.n={n}", cfg.load_config
+                yield f"config.compile_plans.n={n}", lambda cfg=cfg: cfg.compile_plans(cfg.config["profiles"])
+                yield f"template_bank.build.n={n}", lambda: TemplateBank(gestures)
+                cfg.close()
+        finally:
+            os.chdir(old)
+
+def bench_actions(gen):
+    handler = action_handler.ActionHandler(RecordingBackend())
+    real_time = action_handler.time
+    action_handler.time = types.SimpleNamespace(sleep=lambda s: None, time=time.time, monotonic=time.monotonic)
+    sink = io.StringIO()
+    def run(action):
+        def fn():
+            with contextlib.redirect_stdout(sink):
+                handler.execute(action)
+            sink.seek(0)
+            sink.truncate()
+            handler.input.events.clear()
+        return fn
+    try:
+        yield "action.hotkey", run("hotkey:ctrl+c")
+        yield "action.chain", run("chain:hotkey:ctrl+c|mouse:left|hotkey:alt+tab")
+    finally:
+        action_handler.time = real_time
+
+SUITES = [bench_normalize, bench_match, bench_config, bench_actions]
+
+def alloc_frame(gen):
+    engine = GestureEngine(load_model=False, max_hands=2)
+    hand = gen.hand(gen.pose())
+    _, gestures = gen.library(100, samples=1)
+    bank = TemplateBank(gestures)
+    yield "normalize_landmarks", lambda: engine.normalize_landmarks(hand.landmark)
+    yield "find_matching_gesture.n=100", lambda: engine.find_matching_gesture(hand, bank, 0.07)
+    yield "find_matching_gestures.n=100", lambda: engine.find_matching_gestures([hand, hand], bank, 0.07)
+    frame = gen.rng.integers(0, 255, (480, 640, 3), dtype=np.uint8)
+    engine.hands = types.SimpleNamespace(process=lambda img: types.SimpleNamespace(multi_hand_landmarks=None))
+    yield "infer.full_frame", lambda: engine._infer(frame)
+    engine.roi_mode = True
+    yield "infer.roi", lambda: engine._infer(frame)
+
+def measure_alloc(fn, frames=ALLOC_FRAMES):
+    for _ in range(20): fn()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for _ in range(frames): fn()
+        warm = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        for _ in range(frames): fn()
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"peak_bytes": peak - before, "growth_bytes": after - warm, "frames": frames}
+
+def check_alloc(gen, name_filter):
+    alloc, failed = {}, []
+    print(f"\n{'per-frame allocations':<44}{'peak':>12}{'growth':>12}")
+    for name, fn in alloc_frame(gen):
+        if name_filter not in name: continue
+        r = alloc[name] = measure_alloc(fn)
+        flag = "  <-- UNBOUNDED" if r["peak_bytes"] > ALLOC_PEAK_LIMIT or r["growth_bytes"] > ALLOC_GROWTH_LIMIT else ""
+        if flag: failed.append(name)
+        print(f"{name:<44}{r['peak_bytes']:>12}{r['growth_bytes']:>12}{flag}")
+    return alloc, failed
+
+def check_budgets(results):
+    over = []
+    for name, budget in BUDGETS_US.items():
+        r = results.get(name)
+        if r is None: continue
+        flag = "  <-- OVER BUDGET" if r["min_us"] > budget else ""
+        if flag: over.append(name)
+        print(f"{name:<44}{r['min_us']:>12.2f} us (бюджет {budget:.0f}){flag}")
+    return over
+
+def git_rev():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except Exception:
+        return "unknown"
+
+def compare(results, baseline, threshold):
+    regressions = []
+    print(f"\n{'benchmark':<44}{'us':>12}{'base':>12}{'ratio':>8}")
+    for name, r in results.items():
+        b = baseline.get(name)
+        if b is None:
+            print(f"{name:<44}{r['us']:>12.2f}{'-':>12}{'-':>8}")
+            continue
+        ratio = r["min_us"] / b["min_us"] if b["min_us"] else 1.0
+        flag = "  <-- REGRESSION" if ratio > threshold else ""
+        if flag: regressions.append(name)
+        print(f"{name:<44}{r['us']:>12.2f}{b['us']:>12.2f}{ratio:>8.2f}{flag}")
+    return regressions
+
+def main():
+    ap = argparse.ArgumentParser(description="Микробенчмарки горячих путей распознавания")
+    ap.add_argument("--filter", default="", help="запускать только тесты, содержащие подстроку")
+    ap.add_argument("--out", help="файл результатов (по умолчанию benchmarks/results/<commit>.json)")
+    ap.add_argument("--compare", help="файл с базовыми результатами (по умолчанию последний сохранённый)")
+    ap.add_argument("--threshold", type=float, default=1.25, help="допустимое замедление, во сколько раз")
+    ap.add_argument("--min-time", type=float, default=0.2)
+    ap.add_argument("--seed", type=int, default=1234)
+    args = ap.parse_args()
+
+    gen = HandGenerator(args.seed)
+    results = {}
+    for suite in SUITES:
+        for name, fn in suite(gen):
+            if args.filter not in name: continue
+            results[name] = timeit(fn, args.min_time)
+            print(f"{name:<44}{results[name]['us']:>12.2f} us")
+    over_budget = check_budgets(results)
+    alloc, unbounded = check_alloc(gen, args.filter)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out = args.out or os.path.join(RESULTS_DIR, f"{git_rev()}.json")
+    base_path = args.compare
+    if base_path is None:
+        previous = [p for p in glob.glob(os.path.join(RESULTS_DIR, "*.json")) if os.path.abspath(p) != os.path.abspath(out)]
+        base_path = max(previous, key=os.path.getmtime) if previous else None
+
+    meta = {"commit": git_rev(), "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+            "numpy": np.__version__, "machine": platform.machine(), "platform": platform.platform(), "seed": args.seed}
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "results": results, "alloc": alloc}, f, indent=2)
+    print(f"\n[Bench] Сохранено в {out}")
+
+    regressions = []
+    if base_path:
+        with open(base_path, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"[Bench] Сравнение с {base_path} ({baseline['meta'].get('commit')})")
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions:
+            print(f"\n[Bench] Замедление больше x{args.threshold}: {', '.join(regressions)}")
+    if unbounded:
+        print(f"\n[Bench] Аллокации на кадр не ограничены: {', '.join(unbounded)}")
+    if over_budget:
+        print(f"\n[Bench] Превышен бюджет задержки: {', '.join(over_budget)}")
+    if regressions or unbounded or over_budget:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
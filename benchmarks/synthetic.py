@@ -0,0 +1,49 @@
+import numpy as np
+
+from libs.recording import Point, Hand
+
+FINGER_ANGLES = np.array([-0.9, -0.3, 0.0, 0.25, 0.5])
+MCP_RADIUS = np.array([0.3, 0.5, 0.5, 0.5, 0.45])
+BONE = 0.25
+
+class HandGenerator:
+    def __init__(self, seed=0):
+        self.rng = np.random.default_rng(seed)
+
+    def pose(self, curls=None, rotation=None):
+        curls = self.rng.uniform(0, 1.4, 5) if curls is None else np.asarray(curls, dtype=float)
+        rotation = self.rng.uniform(-0.6, 0.6) if rotation is None else rotation
+        pts = np.zeros((21, 2))
+        for f in range(5):
+            ang = FINGER_ANGLES[f]
+            p = np.array([np.sin(ang), -np.cos(ang)]) * MCP_RADIUS[f]
+            pts[1 + 4 * f] = p
+            for j in range(3):
+                a = ang + curls[f] * (j + 1)
+                p = p + np.array([np.sin(a), -np.cos(a)]) * BONE
+                pts[2 + 4 * f + j] = p
+        c, s = np.cos(rotation), np.sin(rotation)
+        return (pts @ np.array([[c, -s], [s, c]]).T).astype(np.float32)
+
+    def place(self, pose, size=None, center=None):
+        size = self.rng.uniform(0.15, 0.35) if size is None else size
+        center = self.rng.uniform(0.3, 0.7, 2) if center is None else center
+        return (pose * size + center).astype(np.float32)
+
+    def noisy(self, pose, sigma=0.01):
+        return (pose + self.rng.normal(0, sigma, pose.shape)).astype(np.float32)
+
+    def hand(self, pose, sigma=0.01):
+        xy = self.place(self.noisy(pose, sigma))
+        z = self.rng.normal(0, 0.02, 21)
+        return Hand([Point(float(x), float(y), float(d)) for (x, y), d in zip(xy, z)])
+
+    def library(self, n_gestures, samples=4, sigma=0.01):
+        protos = [self.pose() for _ in range(n_gestures)]
+        gestures = {}
+        for i, proto in enumerate(protos):
+            raw = np.stack([self.noisy(proto, sigma) for _ in range(samples)])
+            raw -= raw[:, :1]
+            raw /= np.abs(raw).reshape(samples, -1).max(axis=1)[:, None, None]
+            gestures[f"g{i:05d}"] = raw.astype(np.float32)
+        return protos, gestures
@@ -1,69 +1,63 @@
-import pyautogui
 import webbrowser
 import os
 import subprocess
 import platform
 import time
 import pyperclip
+import threading
+import queue
+from libs.action_plan import Plan, ActionError, compile_action
+from libs.input_backend import make_backend
 
 class ActionHandler:
-    def __init__(self):
+    def __init__(self, backend=None):
         self.os_type = platform.system() 
-        pyautogui.FAILSAFE = False
+        self.input = backend or make_backend()
 
-    def execute(self, action_string):
-        if not action_string: return
-
-        if action_string.startswith("chain:"):
-            steps = action_string.split(":", 1)[1].split("|")
-            for step in steps:
-                if step.strip(): self.execute_single(step.strip())
+    def execute(self, action):
+        try:
+            plan = action if isinstance(action, Plan) else compile_action(action)
+        except ActionError as e:
+            print(f"!!! Error: {e}")
             return
+        for op in plan.ops:
+            self.execute_single(op)
 
-        self.execute_single(action_string)
-
-    def execute_single(self, action_string):
+    def execute_single(self, op):
         try:
-            print(f"--> ACTION: {action_string}")
-            
-            if action_string.startswith("wait:"):
-                val = action_string.split(":")[1]
-                time.sleep(int(val) / 1000.0)
-
-            elif action_string.startswith("mouse:"):
-                btn = action_string.split(":")[1].strip().lower()
-                if btn == "left": pyautogui.click()
-                elif btn == "right": pyautogui.rightClick()
-                elif btn == "middle": pyautogui.middleClick()
-                elif btn == "double": pyautogui.doubleClick()
-
-            elif action_string.startswith("hotkey:"):
-                keys = action_string.split(":")[1].lower().split("+")
-                time.sleep(0.1)
-                pyautogui.hotkey(*keys)
-
-            elif action_string.startswith("shell:") or action_string.startswith("app:"):
-                cmd = action_string.split(":", 1)[1].strip()
-                if self.os_type == "Windows":
-                    os.startfile(cmd)
-                else:
-                    subprocess.Popen(cmd, shell=True, start_new_session=True)
-
-            elif action_string.startswith("web:"):
-                url = action_string.split(":", 1)[1].strip()
-                webbrowser.open(url if url.startswith("http") else "https://" + url)
-            
-            elif action_string.startswith("type:"):
-                text = action_string.split(":", 1)[1]
-                self._paste_text(text)
-
-            elif action_string.startswith("paste:"):
-                 text = action_string.split(":", 1)[1]
-                 self._paste_text(text)
-
+            self.run_op(op)
         except Exception as e:
             print(f"!!! Error: {e}")
 
+    def run_op(self, op, cancel=None):
+        print(f"--> ACTION: {op.source}")
+        
+        if op.kind == "wait":
+            if cancel: cancel.wait(op.args[0])
+            else: time.sleep(op.args[0])
+
+        elif op.kind == "mouse":
+            btn = op.args[0]
+            if btn == "double": self.input.click("left", clicks=2)
+            else: self.input.click(btn)
+
+        elif op.kind == "hotkey":
+            time.sleep(0.1)
+            self.input.hotkey(*op.args)
+
+        elif op.kind == "shell":
+            cmd = op.args[0]
+            if self.os_type == "Windows":
+                os.startfile(cmd)
+            else:
+                subprocess.Popen(cmd, shell=True, start_new_session=True)
+
+        elif op.kind == "web":
+            webbrowser.open(op.args[0])
+        
+        elif op.kind == "paste":
+            self._paste_text(op.args[0])
+
     def _paste_text(self, text):
         try:
             pyperclip.copy(text)
@@ -71,8 +65,92 @@ class ActionHandler:
             
             ctrl_key = 'command' if self.os_type == "Darwin" else 'ctrl'
             
-            pyautogui.keyDown(ctrl_key)
-            pyautogui.press('v')
-            pyautogui.keyUp(ctrl_key)
+            self.input.key_down(ctrl_key)
+            self.input.press('v')
+            self.input.key_up(ctrl_key)
         except Exception as e:
-            print(f"Paste Error: {e}")
\ No newline at end of file
+            print(f"Paste Error: {e}")
+
+class ActionExecutor:
+    def __init__(self, handler, maxsize=8):
+        self.handler = handler
+        self.jobs = queue.Queue(maxsize=maxsize)
+        self.events = queue.Queue()
+        self.on_event = None
+        self.current = None
+        self.generation = 0
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._worker, name="ActionExecutor", daemon=True)
+        self.thread.start()
+        return self
+
+    def submit(self, action, tag=None, replace=True):
+        try:
+            plan = action if isinstance(action, Plan) else compile_action(action)
+        except ActionError as e:
+            self._emit(("error", tag, action, str(e)))
+            return False
+        if replace: self.cancel()
+        job = (tag, plan.source, plan.ops, threading.Event(), self.generation)
+        try:
+            self.jobs.put_nowait(job)
+            return True
+        except queue.Full:
+            self._emit(("dropped", tag, plan.source, None))
+            return False
+
+    def cancel(self):
+        with self.lock:
+            self.generation += 1
+            if self.current: self.current[3].set()
+        while True:
+            try:
+                tag, action_string = self.jobs.get_nowait()[:2]
+                self._emit(("cancelled", tag, action_string, None))
+            except queue.Empty:
+                break
+
+    def _worker(self):
+        while True:
+            job = self.jobs.get()
+            if job is None: break
+            tag, action_string, ops, cancel, generation = job
+            with self.lock:
+                if generation != self.generation: cancel.set()
+                self.current = job
+            status, err = "done", None
+            for op in ops:
+                if cancel.is_set():
+                    status = "cancelled"
+                    break
+                try:
+                    self.handler.run_op(op, cancel)
+                except Exception as e:
+                    status, err = "error", f"{op.source}: {e}"
+                    break
+            if status == "done" and cancel.is_set(): status = "cancelled"
+            with self.lock: self.current = None
+            self._emit((status, tag, action_string, err))
+
+    def _emit(self, event):
+        self.events.put(event)
+        if self.on_event: self.on_event(event)
+
+    def poll_events(self):
+        out = []
+        while True:
+            try:
+                out.append(self.events.get_nowait())
+            except queue.Empty:
+                return out
+
+    def stop(self):
+        self.cancel()
+        try:
+            self.jobs.put_nowait(None)
+        except queue.Full:
+            pass
+        if self.thread: self.thread.join(timeout=1.0)
@@ -0,0 +1,71 @@
+from collections import namedtuple
+
+Op = namedtuple("Op", ["kind", "args", "source"])
+Plan = namedtuple("Plan", ["source", "ops"])
+
+MOUSE_BUTTONS = ("left", "right", "middle", "double")
+SPECIALS = ("toggle_follow",)
+
+class ActionError(ValueError):
+    pass
+
+def _compile_step(step):
+    if ":" not in step:
+        raise ActionError(f"нет типа действия в '{step}'")
+    kind, val = step.split(":", 1)
+    kind = kind.strip().lower()
+
+    if kind == "wait":
+        try:
+            ms = int(val.strip())
+        except ValueError:
+            raise ActionError(f"wait: ожидается число миллисекунд, получено '{val}'") from None
+        if ms < 0: raise ActionError(f"wait: отрицательная пауза '{val}'")
+        return Op("wait", (ms / 1000.0,), step)
+
+    if kind == "mouse":
+        btn = val.strip().lower() or "left"
+        if btn not in MOUSE_BUTTONS:
+            raise ActionError(f"mouse: неизвестная кнопка '{val}' (варианты: {', '.join(MOUSE_BUTTONS)})")
+        return Op("mouse", (btn,), step)
+
+    if kind == "hotkey":
+        keys = tuple(k.strip() for k in val.lower().split("+"))
+        if not keys or not all(keys):
+            raise ActionError(f"hotkey: пустая клавиша в '{val}'")
+        return Op("hotkey", keys, step)
+
+    if kind in ("shell", "app"):
+        cmd = val.strip()
+        if not cmd: raise ActionError(f"{kind}: пустая команда")
+        return Op("shell", (cmd,), step)
+
+    if kind == "web":
+        url = val.strip()
+        if not url: raise ActionError("web: пустой адрес")
+        return Op("web", (url if url.startswith("http") else "https://" + url,), step)
+
+    if kind in ("type", "paste"):
+        if not val: raise ActionError(f"{kind}: пустой текст")
+        return Op("paste", (val,), step)
+
+    if kind == "special":
+        name = val.strip()
+        if name not in SPECIALS:
+            raise ActionError(f"special: неизвестная команда '{name}'")
+        return Op("special", (name,), step)
+
+    if kind == "chain":
+        raise ActionError("chain: вложенные цепочки не поддерживаются")
+    raise ActionError(f"неизвестный тип действия '{kind}'")
+
+def compile_action(action_string):
+    if not action_string or not action_string.strip():
+        raise ActionError("пустое действие")
+    source = action_string.strip()
+    if source.startswith("chain:"):
+        steps = [s.strip() for s in source.split(":", 1)[1].split("|") if s.strip()]
+        if not steps: raise ActionError("chain: пустая цепочка")
+    else:
+        steps = [source]
+    return Plan(source, tuple(_compile_step(s) for s in steps))
@@ -0,0 +1,260 @@
+import os
+import platform
+import threading
+import time
+from collections import deque, namedtuple
+
+import cv2
+
+Frame = namedtuple("Frame", ["image", "ts", "seq"])
+
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".webp")
+
+def fourcc_str(value):
+    v = int(value)
+    return "".join(chr((v >> 8 * i) & 0xFF) for i in range(4)) if v > 0 else "?"
+
+class FrameSource:
+    kind = "source"
+    lossless = False
+
+    def __init__(self, window=120):
+        self.times = deque(maxlen=window)
+        self.delivered = 0
+        self.negotiated = {}
+
+    def _tick(self):
+        self.delivered += 1
+        self.times.append(time.monotonic())
+
+    def fps(self):
+        if len(self.times) < 2: return 0.0
+        span = self.times[-1] - self.times[0]
+        return (len(self.times) - 1) / span if span > 0 else 0.0
+
+    def describe(self):
+        info = dict(self.negotiated, kind=self.kind, delivered=self.delivered, fps_measured=round(self.fps(), 1))
+        return info
+
+    def release(self):
+        pass
+
+class CameraSource(FrameSource):
+    kind = "camera"
+
+    def __init__(self, device=0, width=640, height=480, fps=30, fourcc="MJPG", buffer_size=1):
+        super().__init__()
+        api = cv2.CAP_V4L2 if platform.system() == "Linux" else cv2.CAP_ANY
+        self.cap = cv2.VideoCapture(device, api)
+        if not self.cap.isOpened() and api != cv2.CAP_ANY:
+            self.cap = cv2.VideoCapture(device)
+        if fourcc: self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+        if width: self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        if height: self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        if fps: self.cap.set(cv2.CAP_PROP_FPS, fps)
+        if buffer_size: self.cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+        self.negotiated = {
+            "device": device,
+            "backend": self.cap.getBackendName() if self.cap.isOpened() else None,
+            "fourcc": fourcc_str(self.cap.get(cv2.CAP_PROP_FOURCC)),
+            "width": int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": self.cap.get(cv2.CAP_PROP_FPS),
+            "buffer_size": int(self.cap.get(cv2.CAP_PROP_BUFFERSIZE)),
+        }
+
+    def grab(self):
+        return self.cap.grab()
+
+    def read(self):
+        ok, img = self.cap.read()
+        if ok: self._tick()
+        return ok, img
+
+    def release(self):
+        self.cap.release()
+
+class VideoFileSource(FrameSource):
+    kind = "video"
+    lossless = True
+
+    def __init__(self, path, realtime=True, loop=False):
+        super().__init__()
+        self.path = path
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened(): raise ValueError(f"не удалось открыть видео: {path}")
+        self.realtime = realtime
+        self.loop = loop
+        self.file_fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.next_due = None
+        self.negotiated = {
+            "path": path,
+            "fourcc": fourcc_str(self.cap.get(cv2.CAP_PROP_FOURCC)),
+            "width": int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": self.file_fps,
+            "frames": int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT)),
+            "realtime": realtime,
+        }
+
+    def _pace(self):
+        if not self.realtime: return
+        now = time.monotonic()
+        if self.next_due is None: self.next_due = now
+        if now < self.next_due: time.sleep(self.next_due - now)
+        self.next_due = max(self.next_due + 1.0 / self.file_fps, time.monotonic() - 0.5)
+
+    def read(self):
+        ok, img = self.cap.read()
+        if not ok and self.loop and self.delivered:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, img = self.cap.read()
+        if not ok: return False, None
+        self._pace()
+        self._tick()
+        return True, img
+
+    def release(self):
+        self.cap.release()
+
+class ImageDirSource(FrameSource):
+    kind = "images"
+    lossless = True
+
+    def __init__(self, path, fps=30.0, loop=False):
+        super().__init__()
+        self.files = sorted(os.path.join(path, f) for f in os.listdir(path) if f.lower().endswith(IMAGE_EXTS))
+        if not self.files: raise ValueError(f"в папке нет изображений: {path}")
+        self.interval = 1.0 / fps if fps else 0.0
+        self.loop = loop
+        self.pos = 0
+        self.next_due = None
+        first = cv2.imread(self.files[0])
+        self.negotiated = {
+            "path": path,
+            "frames": len(self.files),
+            "width": first.shape[1] if first is not None else 0,
+            "height": first.shape[0] if first is not None else 0,
+            "fps": fps,
+        }
+
+    def read(self):
+        if self.pos >= len(self.files):
+            if not self.loop: return False, None
+            self.pos = 0
+        img = cv2.imread(self.files[self.pos])
+        self.pos += 1
+        if img is None: return False, None
+        if self.interval:
+            now = time.monotonic()
+            if self.next_due is None: self.next_due = now
+            if now < self.next_due: time.sleep(self.next_due - now)
+            self.next_due = max(self.next_due + self.interval, time.monotonic() - 0.5)
+        self._tick()
+        return True, img
+
+def describe_source(info):
+    kind = info.get("kind")
+    if kind == "camera" and not info.get("backend"):
+        return f"Камера {info['device']} не открылась"
+    if kind == "camera":
+        return (f"Камера {info['device']} ({info.get('backend')}): {info['fourcc']} {info['width']}x{info['height']} "
+                f"@ {info['fps']:.1f} fps, буфер {info['buffer_size']}")
+    if kind == "video":
+        return f"Видео {info['path']}: {info['fourcc']} {info['width']}x{info['height']} @ {info['fps']:.1f} fps, кадров {info['frames']}"
+    return f"Изображения {info['path']}: {info['width']}x{info['height']}, кадров {info['frames']}"
+
+def open_source(spec=0, settings=None):
+    settings = settings or {}
+    spec = str(spec)
+    realtime = settings.get("source_realtime", True)
+    loop = settings.get("source_loop", False)
+    if os.path.isdir(spec):
+        return ImageDirSource(spec, settings.get("source_fps", 30) if realtime else 0, loop)
+    if os.path.isfile(spec) and not spec.startswith("/dev/"):
+        return VideoFileSource(spec, realtime, loop)
+    return CameraSource(
+        int(spec) if spec.isdigit() else spec,
+        settings.get("camera_width", 640),
+        settings.get("camera_height", 480),
+        settings.get("camera_fps", 30),
+        settings.get("camera_fourcc", "MJPG"),
+        settings.get("camera_buffer_size", 1)
+    )
+
+class FrameGrabber:
+    def __init__(self, src=0, buffer_size=1, queue_size=4):
+        self.cap = src if hasattr(src, "read") else open_source(src)
+        self.lossless = getattr(self.cap, "lossless", False)
+        self.buf = deque(maxlen=max(1, queue_size if self.lossless else buffer_size))
+        self.cond = threading.Condition()
+        self.seq = 0
+        self.last_seq = 0
+        self.dropped = 0
+        self.skipped = 0
+        self.interval = 0.0
+        self.on_frame = None
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        if self.running: return self
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, name="FrameGrabber", daemon=True)
+        self.thread.start()
+        return self
+
+    def _loop(self):
+        due = 0.0
+        while self.running:
+            if self.interval > 0 and time.monotonic() < due and hasattr(self.cap, "grab"):
+                if not self.cap.grab(): break
+                self.skipped += 1
+                continue
+            ok, img = self.cap.read()
+            ts = time.monotonic()
+            if not ok:
+                break
+            due = ts + self.interval
+            with self.cond:
+                if self.lossless:
+                    self.cond.wait_for(lambda: len(self.buf) < self.buf.maxlen or not self.running)
+                    if not self.running: break
+                self.seq += 1
+                if len(self.buf) == self.buf.maxlen:
+                    self.dropped += 1
+                self.buf.append(Frame(img, ts, self.seq))
+                self.cond.notify_all()
+            if self.on_frame: self.on_frame()
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        if self.on_frame: self.on_frame()
+
+    def read(self, timeout=None):
+        with self.cond:
+            if not self.cond.wait_for(lambda: self.buf or not self.running, timeout):
+                return None
+            if not self.buf: return None
+            if self.lossless:
+                frame = self.buf.popleft()
+                self.cond.notify_all()
+            else:
+                frame = self.buf.pop()
+                self.dropped += len(self.buf)
+                self.buf.clear()
+            self.last_seq = frame.seq
+            return frame
+
+    def stats(self):
+        with self.cond:
+            info = {"captured": self.seq, "dropped": self.dropped, "skipped": self.skipped, "last_seq": self.last_seq}
+        if hasattr(self.cap, "describe"): info["source"] = self.cap.describe()
+        return info
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        if self.thread: self.thread.join(timeout=1.0)
+        self.cap.release()
@@ -1,74 +1,308 @@
+import atexit
+import copy
 import json
 import os
+import stat
+import tempfile
+import threading
+import time
+
+import numpy as np
+from libs.template_bank import TemplateBank
+from libs.action_plan import ActionError, compile_action
+from libs.motion import MotionBank, MOTION_LEN
 
 CONFIG_FILE = "config.json"
+GESTURES_FILE = "gestures.npz"
+SAVE_DEBOUNCE = 0.5
+RESTART_KEYS = {"roi_mode", "inference_size", "roi_margin", "max_hands", "inference_process", "flow_tracking",
+                "flow_max_skip", "flow_max_error", "flow_max_drift", "input_backend", "cursor_rate",
+                "focus_poll_rate", "preview_fps", "ui_rate", "idle_after", "idle_fps", "idle_motion_threshold",
+                "camera_width", "camera_height", "camera_fps", "camera_fourcc", "camera_buffer_size",
+                "source_realtime", "source_loop", "source_fps"}
 
 DEFAULT_CONFIG = {
     "profiles": {
         "GLOBAL": {
-            "actions": {} 
+            "actions": {}
         }
     },
-    "gestures": {}, 
+    "gestures": {},
+    "motions": {},
     "settings": {
         "hold_time": 0.5,
         "threshold": 0.07,
+        "gesture_thresholds": {},
+        "knn_k": 5,
+        "cascade": True,
+        "motion_threshold": 0.3,
         "frame_reduction": 100,
         "trackpad_sensitivity": 3.0,
-        "trackpad_mode": False
+        "cursor_min_cutoff": 1.0,
+        "cursor_beta": 10.0,
+        "cursor_d_cutoff": 1.0,
+        "cursor_prediction": 0.0,
+        "cursor_rate": 240,
+        "input_backend": "auto",
+        "trackpad_mode": False,
+        "roi_mode": False,
+        "inference_size": 320,
+        "roi_margin": 0.3,
+        "inference_process": False,
+        "flow_tracking": False,
+        "flow_max_skip": 2,
+        "flow_max_error": 12.0,
+        "flow_max_drift": 0.25,
+        "focus_poll_rate": 10,
+        "preview_fps": 30,
+        "ui_rate": 30,
+        "idle_after": 5.0,
+        "idle_fps": 5,
+        "idle_motion_threshold": 0.02,
+        "wake_latency_target": 0.3,
+        "max_hands": 1,
+        "disabled_profiles": [],
+        "config_poll_interval": 1.0,
+        "camera_width": 640,
+        "camera_height": 480,
+        "camera_fps": 30,
+        "camera_fourcc": "MJPG",
+        "camera_buffer_size": 1,
+        "source_realtime": True,
+        "source_loop": False,
+        "source_fps": 30,
+        "cursor_hand": "Right"
     }
 }
 
+def _same_type(value, default):
+    if isinstance(default, bool): return isinstance(value, bool)
+    if isinstance(default, float): return isinstance(value, (int, float)) and not isinstance(value, bool)
+    if isinstance(default, int): return isinstance(value, int) and not isinstance(value, bool)
+    return isinstance(value, type(default))
+
+def check_settings(settings):
+    errors = []
+    for key, default in DEFAULT_CONFIG["settings"].items():
+        if key in settings and not _same_type(settings[key], default):
+            errors.append(f"'{key}': ожидается {type(default).__name__}, получено {settings[key]!r}")
+    return errors
+
+def repair_settings(settings):
+    for key, default in DEFAULT_CONFIG["settings"].items():
+        if key in settings and not _same_type(settings[key], default):
+            print(f"[Config] '{key}': ожидается {type(default).__name__}, получено {settings[key]!r}, используется значение по умолчанию")
+        if not _same_type(settings.get(key), default): settings[key] = copy.deepcopy(default)
+    return settings
+
+def merge_legacy_gestures(gestures, legacy):
+    merged, added = dict(gestures), []
+    for name, samples in (legacy or {}).items():
+        if not samples: continue
+        arr = np.asarray(samples, dtype=np.float32).reshape(-1, 21, 2)
+        if name in merged:
+            old = np.asarray(merged[name], dtype=np.float32).reshape(-1, 21, 2)
+            new = [a for a in arr if not any(np.array_equal(a, o) for o in old)]
+            if not new: continue
+            arr = np.concatenate([old, np.stack(new)])
+        merged[name] = arr
+        added.append(name)
+    return merged, added
+
+def atomic_write(path, write_fn, mode="wb"):
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=".tmp_", dir=folder)
+    try:
+        if os.path.exists(path): os.chmod(tmp, stat.S_IMODE(os.stat(path).st_mode))
+        with os.fdopen(fd, mode, **({"encoding": "utf-8"} if "b" not in mode else {})) as f:
+            write_fn(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp): os.remove(tmp)
+        raise
+
+def file_stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+def load_gestures(path):
+    with np.load(path, allow_pickle=False) as data:
+        names, arrays = data["names"], data["landmarks"]
+        labels = data["labels"] if "labels" in data else np.arange(len(names))
+        gestures = {str(n): arrays[labels == i] for i, n in enumerate(names)}
+        motions = {}
+        if "motion_names" in data:
+            m_names, m_arrays = data["motion_names"], data["motion_data"]
+            motions = {str(n): m_arrays[i] for i, n in enumerate(m_names)}
+        return gestures, motions
+
 class ConfigManager:
-    def __init__(self):
+    def __init__(self, read_only=False):
+        self.read_only = read_only
+        self.lock = threading.RLock()
+        self.write_lock = threading.RLock()
+        self.cond = threading.Condition(self.lock)
+        self.dirty = False
+        self.gestures_dirty = False
+        self.last_change = 0.0
+        self.closing = False
+
         self.config = self.load_config()
+        self.bank = TemplateBank(self.config["gestures"])
+        self.bank.cascade = self.config["settings"].get("cascade", True)
+        self.motion_bank = MotionBank(self.config["motions"])
+        self.plans = self.compile_plans(self.config["profiles"])
+        self.stamps = {p: file_stamp(p) for p in (CONFIG_FILE, GESTURES_FILE)}
+        self.next_poll = 0.0
+
+        self.writer = None
+        if read_only: return
+        self.writer = threading.Thread(target=self._writer, name="ConfigWriter", daemon=True)
+        self.writer.start()
+        atexit.register(self.close)
 
     def load_config(self):
         if not os.path.exists(CONFIG_FILE):
-            self._create_default()
-            return DEFAULT_CONFIG
+            data = copy.deepcopy(DEFAULT_CONFIG)
+            self._mark_dirty(gestures=True)
+            return data
         try:
             with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-                if "profiles" not in data: data["profiles"] = DEFAULT_CONFIG["profiles"]
-                if "gestures" not in data: data["gestures"] = {}
-                if "settings" not in data: data["settings"] = DEFAULT_CONFIG["settings"]
-                return data
+                if "profiles" not in data: data["profiles"] = copy.deepcopy(DEFAULT_CONFIG["profiles"])
+                if not isinstance(data.get("settings"), dict): data["settings"] = {}
+                repair_settings(data["settings"])
         except Exception as e:
             print(f"[Config] Ошибка загрузки ({e}). Сброс к заводским.")
-            return DEFAULT_CONFIG
+            return copy.deepcopy(DEFAULT_CONFIG)
+
+        legacy = data.pop("gestures", None) or {}
+        gestures, data["motions"] = {}, {}
+        if os.path.exists(GESTURES_FILE):
+            try:
+                gestures, data["motions"] = load_gestures(GESTURES_FILE)
+            except Exception as e:
+                print(f"[Config] Ошибка загрузки жестов ({e}).")
+        data["gestures"], added = merge_legacy_gestures(gestures, legacy)
+        if added: print(f"[Config] Жесты из {CONFIG_FILE} перенесены в {GESTURES_FILE}: {', '.join(added)}")
+        if legacy: self._mark_dirty(gestures=bool(added))
+        return data
 
-    def _create_default(self):
-        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-            json.dump(DEFAULT_CONFIG, f, indent=4, ensure_ascii=False)
+    def _mark_dirty(self, gestures=False):
+        if self.read_only: return
+        with self.cond:
+            self.dirty = True
+            self.gestures_dirty = self.gestures_dirty or gestures
+            self.last_change = time.monotonic()
+            self.cond.notify()
 
     def save_to_file(self):
-        try:
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=4, ensure_ascii=False)
-        except Exception as e:
-            print(f"[Config] Ошибка сохранения: {e}")
-
-    def save_gesture(self, name, landmarks, action_cmd=None, profile="GLOBAL"):
-        if landmarks:
-            self.config["gestures"][name] = landmarks
-        
-        if profile not in self.config["profiles"]:
-            self.config["profiles"][profile] = {"actions": {}}
-            
-        if action_cmd:
-             self.config["profiles"][profile]["actions"][name] = action_cmd
-        self.save_to_file()
+        self._mark_dirty()
+
+    def _writer(self):
+        while True:
+            with self.cond:
+                while not self.dirty and not self.closing:
+                    self.cond.wait()
+                while not self.closing:
+                    remaining = self.last_change + SAVE_DEBOUNCE - time.monotonic()
+                    if remaining <= 0: break
+                    self.cond.wait(remaining)
+                if self.closing: return
+            self.flush()
+
+    def flush(self):
+        with self.write_lock:
+            with self.lock:
+                if not self.dirty: return
+                meta = {k: v for k, v in self.config.items() if k not in ("gestures", "motions")}
+                text = json.dumps(meta, indent=4, ensure_ascii=False)
+                gestures = None
+                if self.gestures_dirty:
+                    gestures = dict(self.config["gestures"])
+                    motions = dict(self.config["motions"])
+                self.dirty = False
+                self.gestures_dirty = False
+            try:
+                if gestures is not None:
+                    names = np.array(list(gestures.keys()), dtype=str)
+                    samples = [np.asarray(v, dtype=np.float32).reshape(-1, 21, 2) for v in gestures.values()]
+                    arrays = np.concatenate(samples) if samples else np.zeros((0, 21, 2), dtype=np.float32)
+                    labels = np.repeat(np.arange(len(samples), dtype=np.int32), [len(v) for v in samples])
+                    m_names = np.array(list(motions.keys()), dtype=str)
+                    m_arrays = np.array(list(motions.values()), dtype=np.float32).reshape(-1, MOTION_LEN, 2)
+                    atomic_write(GESTURES_FILE, lambda f: np.savez(f, names=names, landmarks=arrays, labels=labels,
+                                                                   motion_names=m_names, motion_data=m_arrays))
+                    self.stamps[GESTURES_FILE] = file_stamp(GESTURES_FILE)
+                atomic_write(CONFIG_FILE, lambda f: f.write(text), mode="w")
+                self.stamps[CONFIG_FILE] = file_stamp(CONFIG_FILE)
+            except Exception as e:
+                print(f"[Config] Ошибка сохранения: {e}")
+                self._mark_dirty(gestures=gestures is not None)
+
+    def close(self):
+        with self.cond:
+            self.closing = True
+            self.cond.notify()
+        if self.writer: self.writer.join(timeout=1.0)
+        self.flush()
+
+    def compile_plans(self, profiles):
+        plans = {}
+        for prof_name, prof in profiles.items():
+            for gesture, act in prof.get("actions", {}).items():
+                try:
+                    plans[(prof_name, gesture)] = compile_action(act)
+                except ActionError as e:
+                    print(f"[Config] Действие '{gesture}' ({prof_name}) отклонено: {e}")
+        return plans
+
+    def save_gesture(self, name, landmarks, action_cmd=None, profile="GLOBAL", motion=None):
+        plan = compile_action(action_cmd) if action_cmd else None
+        with self.lock:
+            if motion is not None:
+                seq = np.asarray(motion, dtype=np.float32)
+                self.config["motions"][name] = seq
+                self.motion_bank.add(name, seq)
+                self.gestures_dirty = True
+                landmarks = None
+
+            if landmarks is not None and len(landmarks):
+                arr = np.asarray(landmarks, dtype=np.float32).reshape(-1, 21, 2)
+                self.bank.add(name, arr)
+                self.config["gestures"][name] = self.bank.samples(name)
+                self.gestures_dirty = True
+
+            if profile not in self.config["profiles"]:
+                self.config["profiles"][profile] = {"actions": {}}
+
+            if plan:
+                 self.config["profiles"][profile]["actions"][name] = action_cmd
+                 self.plans[(profile, name)] = plan
+            self.save_to_file()
 
     def delete_gesture(self, name, profile="GLOBAL"):
-        if profile in self.config["profiles"]:
-            if name in self.config["profiles"][profile]["actions"]:
-                del self.config["profiles"][profile]["actions"][name]
-        
-        is_used = any(name in p["actions"] for p in self.config["profiles"].values())
-        if not is_used and name in self.config["gestures"]:
-             del self.config["gestures"][name]
-        self.save_to_file()
+        with self.lock:
+            if profile in self.config["profiles"]:
+                if name in self.config["profiles"][profile]["actions"]:
+                    del self.config["profiles"][profile]["actions"][name]
+                    self.plans.pop((profile, name), None)
+
+            is_used = any(name in p["actions"] for p in self.config["profiles"].values())
+            if not is_used and name in self.config["gestures"]:
+                 del self.config["gestures"][name]
+                 self.bank.remove(name)
+                 self.gestures_dirty = True
+            if not is_used and name in self.config["motions"]:
+                 del self.config["motions"][name]
+                 self.motion_bank.remove(name)
+                 self.gestures_dirty = True
+            self.save_to_file()
 
     def get_action(self, gesture_name, active_app=None):
         if active_app and active_app in self.config["profiles"]:
@@ -76,9 +310,128 @@ class ConfigManager:
             if act: return act
         return self.config["profiles"]["GLOBAL"]["actions"].get(gesture_name)
 
+    def get_plan(self, gesture_name, active_app=None):
+        disabled = self.config["settings"].get("disabled_profiles", ())
+        if active_app and active_app in self.config["profiles"] and active_app not in disabled:
+            plan = self.plans.get((active_app, gesture_name))
+            if plan: return plan
+        if "GLOBAL" in disabled: return None
+        return self.plans.get(("GLOBAL", gesture_name))
+
+    def set_profile_enabled(self, profile, enabled):
+        with self.lock:
+            if profile not in self.config["profiles"]: return False
+            disabled = [p for p in self.config["settings"].get("disabled_profiles", []) if p != profile]
+            if not enabled: disabled.append(profile)
+            self.config["settings"]["disabled_profiles"] = disabled
+            self.save_to_file()
+            return True
+
+    def _read_external(self, with_gestures):
+        with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, dict): raise ValueError("корень конфига должен быть объектом")
+        profiles = data.get("profiles")
+        if not isinstance(profiles, dict) or "GLOBAL" not in profiles: raise ValueError("нет профиля GLOBAL")
+        if not isinstance(data.get("settings"), dict): raise ValueError("settings должен быть объектом")
+        errors = check_settings(data["settings"])
+        if errors: raise ValueError("; ".join(errors))
+        repair_settings(data["settings"])
+        plans = {}
+        for prof_name, prof in profiles.items():
+            if not isinstance(prof, dict) or not isinstance(prof.get("actions", {}), dict):
+                raise ValueError(f"профиль '{prof_name}' повреждён")
+            for gesture, act in prof.get("actions", {}).items():
+                try:
+                    plans[(prof_name, gesture)] = compile_action(act)
+                except ActionError as e:
+                    raise ValueError(f"действие '{gesture}' ({prof_name}): {e}")
+
+        legacy = data.pop("gestures", None)
+        if legacy is not None and not isinstance(legacy, dict): raise ValueError("gestures должен быть объектом")
+        gestures = motions = None
+        if with_gestures and os.path.exists(GESTURES_FILE):
+            gestures, motions = load_gestures(GESTURES_FILE)
+        if legacy: merge_legacy_gestures({}, legacy)
+        return data, plans, gestures, motions, legacy
+
+    def _diff_samples(self, old, new, same):
+        removed = [k for k in old if k not in new]
+        changed = [k for k, v in new.items() if k not in old or not same(old[k], v)]
+        return removed, changed
+
+    def reload(self, with_gestures=True):
+        with self.write_lock:
+            return self._reload(with_gestures)
+
+    def _reload(self, with_gestures):
+        data, plans, gestures, motions, legacy = self._read_external(with_gestures)
+        with self.lock:
+            added = []
+            if legacy:
+                gestures, added = merge_legacy_gestures(self.config["gestures"] if gestures is None else gestures, legacy)
+                if added: print(f"[Config] Жесты из {CONFIG_FILE} перенесены в {GESTURES_FILE}: {', '.join(added)}")
+            old_s, new_s = self.config["settings"], data["settings"]
+            settings = sorted(k for k in set(old_s) | set(new_s) if old_s.get(k) != new_s.get(k))
+            plan_changes = [k for k in set(self.plans) | set(plans)
+                            if k not in self.plans or k not in plans or self.plans[k].source != plans[k].source]
+            for key in plan_changes:
+                if key in plans: self.plans[key] = plans[key]
+                else: del self.plans[key]
+
+            g_removed, g_changed = [], []
+            if gestures is not None:
+                same = lambda a, b: np.array_equal(np.asarray(a, dtype=np.float32).reshape(-1, 21, 2), b)
+                g_removed, g_changed = self._diff_samples(self.config["gestures"], gestures, same)
+                for name in g_removed + g_changed: self.bank.remove(name)
+                for name in g_changed: self.bank.add(name, gestures[name])
+            m_removed, m_changed = [], []
+            if motions is not None:
+                same = lambda a, b: np.array_equal(np.asarray(a, dtype=np.float32), b)
+                m_removed, m_changed = self._diff_samples(self.config["motions"], motions, same)
+                for name in m_removed: self.motion_bank.remove(name)
+                for name in m_changed: self.motion_bank.add(name, motions[name])
+
+            data["gestures"] = gestures if gestures is not None else self.config["gestures"]
+            data["motions"] = motions if motions is not None else self.config["motions"]
+            self.config = data
+            self.bank.cascade = new_s.get("cascade", True)
+            if legacy: self._mark_dirty(gestures=bool(added))
+
+        summary = {
+            "settings": settings,
+            "plans": len(plan_changes),
+            "gestures": {"changed": len(g_changed), "removed": len(g_removed)},
+            "motions": {"changed": len(m_changed), "removed": len(m_removed)},
+        }
+        if settings or plan_changes or g_removed or g_changed or m_removed or m_changed:
+            print(f"[Config] Применены изменения: действий {len(plan_changes)}, "
+                  f"жестов {len(g_changed)}/-{len(g_removed)}, настройки: {', '.join(settings) or '-'}")
+        restart = RESTART_KEYS.intersection(settings)
+        if restart: print(f"[Config] Вступят в силу после перезапуска: {', '.join(sorted(restart))}")
+        return summary
+
+    def check_reload(self, now=None):
+        now = time.monotonic() if now is None else now
+        if now < self.next_poll: return None
+        self.next_poll = now + self.config["settings"].get("config_poll_interval", 1.0)
+        with self.write_lock:
+            if self.dirty: return None
+            stamps = {p: file_stamp(p) for p in (CONFIG_FILE, GESTURES_FILE)}
+            if stamps == self.stamps or stamps[CONFIG_FILE] is None: return None
+            with_gestures = stamps[GESTURES_FILE] != self.stamps.get(GESTURES_FILE)
+            self.stamps = stamps
+            try:
+                return self._reload(with_gestures)
+            except Exception as e:
+                print(f"[Config] Изменения в файле отклонены: {e}")
+                return None
+
     def get_gestures(self):
         return self.config["gestures"]
-    
+
     def save_setting(self, key, value):
-        self.config["settings"][key] = value
-        self.save_to_file()
\ No newline at end of file
+        with self.lock:
+            self.config["settings"][key] = value
+            if key == "cascade": self.bank.cascade = bool(value)
+            self.save_to_file()
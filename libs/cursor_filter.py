@@ -0,0 +1,64 @@
+import math
+
+def _alpha(cutoff, dt):
+    tau = 1.0 / (2 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+class OneEuroFilter:
+    def __init__(self, min_cutoff=1.0, beta=10.0, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self.x = None
+        self.dx = 0.0
+        self.t = None
+
+    def __call__(self, x, t):
+        if self.t is None or t <= self.t:
+            if self.t is None: self.x, self.dx = x, 0.0
+            self.t = t
+            return self.x
+        dt = t - self.t
+        self.t = t
+        dx = (x - self.x) / dt
+        self.dx += _alpha(self.d_cutoff, dt) * (dx - self.dx)
+        cutoff = self.min_cutoff + self.beta * abs(self.dx)
+        self.x += _alpha(cutoff, dt) * (x - self.x)
+        return self.x
+
+class CursorFilter:
+    def __init__(self, min_cutoff=1.0, beta=10.0, d_cutoff=1.0, prediction=0.0):
+        self.fx = OneEuroFilter(min_cutoff, beta, d_cutoff)
+        self.fy = OneEuroFilter(min_cutoff, beta, d_cutoff)
+        self.prediction = prediction
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(
+            settings.get("cursor_min_cutoff", 1.0),
+            settings.get("cursor_beta", 10.0),
+            settings.get("cursor_d_cutoff", 1.0),
+            settings.get("cursor_prediction", 0.0)
+        )
+
+    def configure(self, settings):
+        for f in (self.fx, self.fy):
+            f.min_cutoff = settings.get("cursor_min_cutoff", 1.0)
+            f.beta = settings.get("cursor_beta", 10.0)
+            f.d_cutoff = settings.get("cursor_d_cutoff", 1.0)
+        self.prediction = settings.get("cursor_prediction", 0.0)
+
+    def reset(self):
+        self.fx.reset()
+        self.fy.reset()
+
+    def __call__(self, x, y, t, latency=0.0):
+        x, y = self.fx(x, t), self.fy(y, t)
+        lead = self.prediction * latency
+        if lead > 0:
+            x += self.fx.dx * lead
+            y += self.fy.dx * lead
+        return x, y
@@ -0,0 +1,230 @@
+import json
+import os
+import queue
+import signal
+import socketserver
+import tempfile
+import threading
+import time
+
+from libs.config_manager import ConfigManager
+from libs.action_handler import ActionHandler, ActionExecutor
+from libs.input_backend import make_backend, CursorMotion
+from libs.capture import FrameGrabber, open_source, describe_source
+from libs.window_focus import WindowFocus
+from libs.session import GestureSession
+from libs.stats import PipelineStats
+from libs.idle import IdleGate
+from libs.pipeline import FramePipeline, build_engine
+
+def default_socket_path():
+    return os.path.join(os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir(), "gesture-controller.sock")
+
+class EventStream:
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.subscribers = []
+        self.dropped = 0
+
+    def subscribe(self):
+        q = queue.Queue(maxsize=self.maxsize)
+        with self.lock:
+            self.subscribers.append(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self.lock:
+            if q in self.subscribers: self.subscribers.remove(q)
+
+    def publish(self, event, **fields):
+        with self.lock:
+            if not self.subscribers: return
+            subs = list(self.subscribers)
+        msg = dict(event=event, ts=time.time(), **fields)
+        for q in subs:
+            try:
+                q.put_nowait(msg)
+            except queue.Full:
+                self.dropped += 1
+
+class _Handler(socketserver.StreamRequestHandler):
+    def _send(self, msg):
+        self.wfile.write((json.dumps(msg, ensure_ascii=False) + "\n").encode("utf-8"))
+        self.wfile.flush()
+
+    def handle(self):
+        server = self.server.control
+        for line in self.rfile:
+            if not line.strip(): continue
+            try:
+                req = json.loads(line)
+            except ValueError:
+                self._send({"ok": False, "error": "некорректный JSON"})
+                continue
+            if not isinstance(req, dict):
+                self._send({"ok": False, "error": "запрос должен быть JSON-объектом"})
+                continue
+            cmd = req.get("cmd")
+            if cmd == "subscribe":
+                self._send({"ok": True})
+                self._stream(server.bus)
+                return
+            try:
+                self._send(dict(ok=True, **server.call(cmd, req)))
+            except Exception as e:
+                self._send({"ok": False, "error": str(e)})
+
+    def _stream(self, bus):
+        q = bus.subscribe()
+        try:
+            while self.server.control.running:
+                try:
+                    self._send(q.get(timeout=0.5))
+                except queue.Empty:
+                    continue
+        except OSError:
+            pass
+        finally:
+            bus.unsubscribe(q)
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+class ControlServer:
+    def __init__(self, path, commands, timeout=5.0):
+        self.path = path
+        self.commands = commands
+        self.timeout = timeout
+        self.bus = EventStream()
+        self.calls = queue.Queue()
+        self.running = False
+        self.server = None
+
+    def start(self):
+        if os.path.exists(self.path): os.unlink(self.path)
+        self.server = _Server(self.path, _Handler)
+        self.server.control = self
+        os.chmod(self.path, 0o600)
+        self.running = True
+        threading.Thread(target=self.server.serve_forever, name="ControlServer", daemon=True).start()
+        print(f"[Daemon] API: {self.path}")
+        return self
+
+    def call(self, cmd, req):
+        fn = self.commands.get(cmd)
+        if fn is None: raise ValueError(f"неизвестная команда '{cmd}'")
+        done, box = threading.Event(), {}
+        self.calls.put((fn, req, done, box))
+        if not done.wait(self.timeout): raise TimeoutError("основной цикл не ответил")
+        if "error" in box: raise box["error"]
+        return box["result"]
+
+    def run_pending(self):
+        while True:
+            try:
+                fn, req, done, box = self.calls.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                box["result"] = fn(req) or {}
+            except Exception as e:
+                box["error"] = e
+            done.set()
+
+    def stop(self):
+        self.running = False
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+        if os.path.exists(self.path): os.unlink(self.path)
+
+def run_daemon(socket_path=None, source="0", stats_path=None):
+    cfg = ConfigManager()
+    settings = cfg.config["settings"]
+    engine = build_engine(settings)
+    worker = engine.worker
+    stats = PipelineStats(enabled=True)
+    engine.stats = stats
+    input_backend = make_backend(settings.get("input_backend", "auto"))
+    cursor = CursorMotion(input_backend, settings.get("cursor_rate", 240)).start()
+    executor = ActionExecutor(ActionHandler(input_backend)).start()
+    focus = WindowFocus(rate=settings.get("focus_poll_rate", 10)).start()
+    source = open_source(source, settings)
+    print(f"[Capture] {describe_source(source.describe())}")
+    grabber = FrameGrabber(source).start()
+    session = GestureSession(engine, cfg, executor, cursor)
+    idle = IdleGate.from_settings(settings)
+    pipeline = FramePipeline(engine, session, idle, grabber, stats)
+    stop = threading.Event()
+
+    def cmd_stats(req):
+        snap = stats.snapshot()
+        snap["capture"] = grabber.stats()
+        snap["idle"] = {"idle": idle.idle, "cpu_percent": idle.cpu_percent(), "wakeups": idle.wakeups}
+        snap["cascade_pruning_ratio"] = cfg.bank.pruning_ratio()
+        if engine.flow: snap["flow_model_call_ratio"] = engine.flow.model_call_ratio()
+        if worker: snap["worker"] = {"submitted": worker.submitted, "dropped": worker.dropped, "late": worker.late}
+        snap["events_dropped"] = server.bus.dropped
+        return {"stats": snap}
+
+    def cmd_reload(req):
+        cfg.flush()
+        return {"changes": cfg.reload()}
+
+    def cmd_profiles(req):
+        disabled = cfg.config["settings"].get("disabled_profiles", [])
+        return {"profiles": {p: p not in disabled for p in cfg.config["profiles"]}, "active": focus.title}
+
+    def toggle(enabled):
+        def fn(req):
+            if not cfg.set_profile_enabled(req.get("profile"), enabled):
+                raise ValueError(f"нет профиля '{req.get('profile')}'")
+            return cmd_profiles(req)
+        return fn
+
+    server = ControlServer(socket_path or default_socket_path(), {
+        "stats": cmd_stats,
+        "reload": cmd_reload,
+        "profiles": cmd_profiles,
+        "enable": toggle(True),
+        "disable": toggle(False),
+        "stop": lambda req: stop.set(),
+    }).start()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *a: stop.set())
+
+    print("--- DAEMON READY ---")
+    last_gesture = None
+    while not stop.is_set():
+        server.run_pending()
+        cfg.check_reload()
+        captured = grabber.read(timeout=0.1)
+        if captured is None:
+            if not grabber.running: break
+            continue
+        t0 = time.perf_counter()
+        result = pipeline.process(captured, focus.title)
+        out = result.out
+        if result.woke: server.bus.publish("wake")
+        if result.slept: server.bus.publish("idle")
+        if out.gesture != last_gesture:
+            server.bus.publish("gesture", name=out.gesture, app=focus.title)
+            last_gesture = out.gesture
+        if out.fired:
+            server.bus.publish("fired", gesture=out.motion or session.curr_gest, action=out.fired, app=focus.title)
+        for status, tag, act, err in executor.poll_events():
+            server.bus.publish("action", status=status, gesture=tag, action=act, error=err)
+            if status == "error": print(f"!!! Error [{tag}]: {err}")
+        stats.add("frame", time.perf_counter() - t0)
+
+    server.stop()
+    cfg.close()
+    focus.stop()
+    executor.stop()
+    cursor.stop()
+    grabber.stop()
+    if worker: worker.stop()
+    if stats_path:
+        stats.export(stats_path)
+        print(f"[Stats] Сохранено в {stats_path}")
@@ -0,0 +1,95 @@
+import asyncio
+import queue
+import threading
+
+class EventBus:
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.queue = None
+        self.handlers = {}
+        self.thread = None
+        self.running = False
+        self.errors = 0
+
+    def on(self, kind, fn):
+        self.handlers.setdefault(kind, []).append(fn)
+        return self
+
+    def post(self, kind, payload=None):
+        if not self.running: return
+        try:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, (kind, payload))
+        except RuntimeError:
+            pass
+
+    def every(self, interval, kind):
+        def tick():
+            if not self.running: return
+            self.queue.put_nowait((kind, None))
+            self.loop.call_later(interval, tick)
+        self.loop.call_soon_threadsafe(self.loop.call_later, interval, tick)
+
+    def start(self):
+        if self.running: return self
+        self.running = True
+        ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, args=(ready,), name="EventBus", daemon=True)
+        self.thread.start()
+        ready.wait()
+        return self
+
+    def _run(self, ready):
+        asyncio.set_event_loop(self.loop)
+        self.queue = asyncio.Queue()
+        ready.set()
+        self.loop.run_until_complete(self._dispatch())
+        self.loop.close()
+
+    async def _dispatch(self):
+        while self.running:
+            kind, payload = await self.queue.get()
+            if kind == "stop": break
+            for fn in self.handlers.get(kind, ()):
+                try:
+                    fn(payload)
+                except Exception as e:
+                    self.errors += 1
+                    print(f"!!! Ошибка обработчика '{kind}': {e}")
+        self.running = False
+        for fn in self.handlers.get("stop", ()): fn(None)
+
+    def stop(self):
+        self.post("stop")
+
+    def join(self, timeout=None):
+        if self.thread: self.thread.join(timeout)
+
+class UiDispatcher:
+    def __init__(self, root, poll_ms=20):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.queue = queue.Queue()
+        try:
+            self.threaded = bool(int(root.tk.eval("set tcl_platform(threaded)")))
+        except: self.threaded = False
+        if not self.threaded: self.root.after(self.poll_ms, self._poll)
+
+    def post(self, fn, *args):
+        if not self.threaded:
+            self.queue.put((fn, args))
+            return
+        try:
+            self.root.after(0, fn, *args)
+        except RuntimeError: pass
+
+    def _poll(self):
+        while True:
+            try:
+                fn, args = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"!!! Ошибка в потоке интерфейса: {e}")
+        self.root.after(self.poll_ms, self._poll)
@@ -0,0 +1,104 @@
+from collections import namedtuple
+
+import numpy as np
+import cv2
+
+from libs.recording import Point, Hand
+
+TrackedResults = namedtuple("TrackedResults", ["multi_hand_landmarks", "multi_handedness"])
+
+def _make_hand(template, pts):
+    if hasattr(template, "CopyFrom"):
+        hand = type(template)()
+        for x, y, z in pts: hand.landmark.add(x=x, y=y, z=z)
+        return hand
+    return Hand([Point(x, y, z) for x, y, z in pts])
+
+class FlowTracker:
+    def __init__(self, max_skip=2, max_error=12.0, max_drift=0.25, margin=0.3, crop_size=160, win=15, levels=2):
+        self.max_skip = max_skip
+        self.max_error = max_error
+        self.max_drift = max_drift
+        self.margin = margin
+        self.crop_size = crop_size
+        self.lk = dict(winSize=(win, win), maxLevel=levels,
+                       criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+        self.keyframes = 0
+        self.tracked = 0
+        self.rejected = 0
+        self.reset()
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(
+            settings.get("flow_max_skip", 2),
+            settings.get("flow_max_error", 12.0),
+            settings.get("flow_max_drift", 0.25)
+        )
+
+    def reset(self):
+        self.prev = None
+        self.pts = None
+        self.base = None
+        self.since = 0
+
+    def _crop(self, frame):
+        x0, y0, x1, y1 = self.box
+        crop = frame[y0:y1, x0:x1]
+        if self.scale != 1.0:
+            crop = cv2.resize(crop, (max(1, int((x1 - x0) * self.scale)), max(1, int((y1 - y0) * self.scale))), interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
+
+    def keyframe(self, frame, results):
+        self.keyframes += 1
+        hands = results.multi_hand_landmarks if results else None
+        if not hands or self.max_skip <= 0:
+            self.reset()
+            return
+        h, w = frame.shape[:2]
+        xy = np.array([[lm.x * w, lm.y * h] for hand in hands for lm in hand.landmark], dtype=np.float32)
+        lo, hi = xy.min(axis=0), xy.max(axis=0)
+        pad = (hi - lo).max() * self.margin
+        x0, y0 = np.maximum(lo - pad, 0).astype(int)
+        x1, y1 = np.minimum(hi + pad, (w, h)).astype(int)
+        if x1 - x0 < 8 or y1 - y0 < 8:
+            self.reset()
+            return
+        self.box = (x0, y0, x1, y1)
+        self.size = float((hi - lo).max()) or 1.0
+        self.scale = min(1.0, self.crop_size / max(x1 - x0, y1 - y0))
+        self.frame_wh = (w, h)
+        self.z = [[lm.z for lm in hand.landmark] for hand in hands]
+        self.templates = hands
+        self.handedness = results.multi_handedness
+        self.prev = self._crop(frame)
+        self.pts = ((xy - (x0, y0)) * self.scale).astype(np.float32).reshape(-1, 1, 2)
+        self.base = self.pts
+        self.since = 0
+
+    def track(self, frame):
+        if self.prev is None or self.since >= self.max_skip or frame.shape[1::-1] != self.frame_wh:
+            return None
+        curr = self._crop(frame)
+        pts, status, err = cv2.calcOpticalFlowPyrLK(self.prev, curr, self.pts, None, **self.lk)
+        drift = np.linalg.norm((pts - self.base).reshape(-1, 2), axis=1).mean() / self.scale / self.size
+        ch, cw = curr.shape
+        inside = (pts[..., 0] >= 0).all() and (pts[..., 1] >= 0).all() and (pts[..., 0] < cw).all() and (pts[..., 1] < ch).all()
+        if not status.all() or float(err.mean()) > self.max_error or drift > self.max_drift or not inside:
+            self.rejected += 1
+            self.reset()
+            return None
+        self.prev, self.pts = curr, pts
+        self.since += 1
+        self.tracked += 1
+
+        w, h = self.frame_wh
+        x0, y0 = self.box[:2]
+        xy = pts.reshape(-1, 21, 2) / self.scale + (x0, y0)
+        hands = [_make_hand(t, [(float(x) / w, float(y) / h, z) for (x, y), z in zip(hand, zs)])
+                 for t, hand, zs in zip(self.templates, xy, self.z)]
+        return TrackedResults(hands, self.handedness)
+
+    def model_call_ratio(self):
+        total = self.keyframes + self.tracked
+        return self.keyframes / total if total else 1.0
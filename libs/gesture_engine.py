@@ -6,59 +6,173 @@ os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
 import mediapipe as mp
 import numpy as np
 import cv2
+from libs.template_bank import TemplateBank, NUM_POINTS, POINT_DIM
+from libs.stats import NULL_STATS
+from libs.motion import LandmarkHistory
 
 class GestureEngine:
-    def __init__(self):
+    def __init__(self, roi_mode=False, inference_size=320, roi_margin=0.3, load_model=True, max_hands=1, flow=None, worker=None):
+        self.roi_mode = roi_mode
+        self.inference_size = inference_size
+        self.roi_margin = roi_margin
+        self.roi = None
+        self.stats = NULL_STATS
+        self.history = LandmarkHistory()
+        self.flow = flow
+        self.worker = worker
+        self.hands = None
+        self.max_hands = max_hands
+        self.raw = np.zeros((NUM_POINTS, 3), dtype=np.float32)
+        self.delta = np.zeros((NUM_POINTS, POINT_DIM), dtype=np.float64)
+        self.norm = np.zeros((NUM_POINTS, POINT_DIM), dtype=np.float32)
+        self.batch = np.zeros((max_hands, NUM_POINTS, POINT_DIM), dtype=np.float32)
+        self.buffers = {}
+        if not load_model: return
         self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
+        if not worker: self.hands = self._new_hands()
+        self.mp_draw = mp.solutions.drawing_utils
+        self.draw_spec = self.mp_draw.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2)
+
+    def _new_hands(self):
+        return self.mp_hands.Hands(
             static_image_mode=False,
-            max_num_hands=1,
+            max_num_hands=self.max_hands,
             model_complexity=0,
             min_detection_confidence=0.7,
             min_tracking_confidence=0.6
         )
-        self.mp_draw = mp.solutions.drawing_utils
-        self.draw_spec = self.mp_draw.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2)
+
+    def _drop_worker(self, error):
+        print(f"[Worker] {error}. Распознавание продолжается в основном процессе")
+        self.worker.stop()
+        self.worker = None
+        if hasattr(self, "mp_hands"): self.hands = self._new_hands()
 
     def process_frame(self, frame):
+        if self.flow:
+            with self.stats.stage("flow.track"):
+                tracked = self.flow.track(frame)
+            if tracked is not None: return tracked
+        if self.worker:
+            try:
+                with self.stats.stage("worker.process"):
+                    results = self.worker.process_frame(frame)
+            except RuntimeError as e:
+                self._drop_worker(e)
+        if not self.worker:
+            results = self._infer(frame)
+        if self.flow: self.flow.keyframe(frame, results)
+        return results
+
+    def reset_tracking(self):
+        self.roi = None
+        if self.flow: self.flow.reset()
+
+    def _infer(self, frame):
         try:
-            img_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = self.hands.process(img_rgb)
+            if not self.roi_mode:
+                with self.stats.stage("cvtColor"):
+                    img_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._buffer("rgb", frame.shape))
+                with self.stats.stage("hands.process"):
+                    results = self.hands.process(img_rgb)
+                return results
+
+            h, w = frame.shape[:2]
+            if self.roi is not None:
+                results = self._process_region(frame, self.roi)
+                if results.multi_hand_landmarks:
+                    self.roi = self._hand_box(results.multi_hand_landmarks, w, h)
+                    return results
+
+            results = self._process_region(frame, (0, 0, w, h))
+            self.roi = self._hand_box(results.multi_hand_landmarks, w, h) if results.multi_hand_landmarks else None
             return results
         except:
+            self.roi = None
             return None
 
-    def normalize_landmarks(self, landmarks):
+    def _process_region(self, frame, box):
+        h, w = frame.shape[:2]
+        x0, y0, x1, y1 = box
+        crop = frame[y0:y1, x0:x1]
+        cw, ch = x1 - x0, y1 - y0
+        scale = self.inference_size / max(cw, ch) if self.inference_size else 1.0
+        with self.stats.stage("cvtColor"):
+            if scale < 1.0:
+                size = (max(1, int(cw * scale)), max(1, int(ch * scale)))
+                crop = cv2.resize(crop, size, dst=self._buffer("roi", (size[1], size[0], 3)), interpolation=cv2.INTER_AREA)
+            img_rgb = cv2.cvtColor(crop, cv2.COLOR_BGR2RGB, dst=self._buffer("roi_rgb", crop.shape))
+        with self.stats.stage("hands.process"):
+            results = self.hands.process(img_rgb)
+
+        if results.multi_hand_landmarks and (cw, ch) != (w, h):
+            for hand in results.multi_hand_landmarks:
+                for lm in hand.landmark:
+                    lm.x = (x0 + lm.x * cw) / w
+                    lm.y = (y0 + lm.y * ch) / h
+                    lm.z = lm.z * cw / w
+        return results
+
+    def _buffer(self, name, shape):
+        buf = self.buffers.get(name)
+        if buf is None or buf.shape != shape:
+            buf = self.buffers[name] = np.empty(shape, dtype=np.uint8)
+        return buf
+
+    def _hand_box(self, hands, w, h):
+        xs = [lm.x for hand in hands for lm in hand.landmark]
+        ys = [lm.y for hand in hands for lm in hand.landmark]
+        x0, x1 = min(xs) * w, max(xs) * w
+        y0, y1 = min(ys) * h, max(ys) * h
+        side = max(x1 - x0, y1 - y0) * (1 + 2 * self.roi_margin)
+        side = min(max(side, 64), w, h)
+        cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+        bx = int(min(max(cx - side / 2, 0), w - side))
+        by = int(min(max(cy - side / 2, 0), h - side))
+        return bx, by, bx + int(side), by + int(side)
+
+    def fill_landmarks(self, landmarks):
+        raw = self.raw
+        for i, lm in enumerate(landmarks):
+            raw[i, 0] = lm.x
+            raw[i, 1] = lm.y
+            raw[i, 2] = lm.z
+        return raw
+
+    def normalize_landmarks(self, landmarks, out=None):
         if not landmarks: return []
-        base_x, base_y = landmarks[0].x, landmarks[0].y
-        coords = np.array([[lm.x - base_x, lm.y - base_y] for lm in landmarks])
-        max_value = np.max(np.abs(coords))
+        raw = self.fill_landmarks(landmarks)
+        delta = self.delta
+        np.subtract(raw[:, :POINT_DIM], raw[0, :POINT_DIM], out=delta, dtype=np.float64)
+        max_value = max(delta.max(), -delta.min())
         if max_value > 0:
-            coords = coords / max_value
-        return coords.tolist()
+            delta /= max_value
+        out = self.norm if out is None else out
+        out[...] = delta
+        return out
 
-    def find_matching_gesture(self, current_landmarks_obj, saved_gestures, threshold=0.1):
+    def find_matching_gesture(self, current_landmarks_obj, bank, threshold=0.1, thresholds=None, k=5):
         if not current_landmarks_obj or not current_landmarks_obj.landmark:
             return None, float('inf')
 
         try:
-            curr_norm = np.array(self.normalize_landmarks(current_landmarks_obj.landmark))
-            best_match = None
-            min_dist = float('inf')
-
-            for name, saved_data in saved_gestures.items():
-                if not saved_data or not isinstance(saved_data, list): continue
-                
-                saved_arr = np.array(saved_data)
-                if saved_arr.shape != curr_norm.shape: continue
-                
-                dist = np.mean(np.linalg.norm(curr_norm - saved_arr, axis=1))
-                if dist < min_dist:
-                    min_dist = dist
-                    best_match = name
-
-            if min_dist < threshold:
-                return best_match, min_dist
-            return None, min_dist
+            if not isinstance(bank, TemplateBank): bank = TemplateBank(bank)
+            return bank.classify(self.normalize_landmarks(current_landmarks_obj.landmark), k, threshold, thresholds)
         except Exception:
-            return None, float('inf')
\ No newline at end of file
+            return None, float('inf')
+
+    def find_matching_gestures(self, hands, bank, threshold=0.1, thresholds=None, k=5):
+        if not hands: return []
+        try:
+            if len(hands) > len(self.batch):
+                self.batch = np.zeros((len(hands), NUM_POINTS, POINT_DIM), dtype=np.float32)
+            for i, h in enumerate(hands): self.normalize_landmarks(h.landmark, self.batch[i])
+            return bank.classify_many(self.batch[:len(hands)], k, threshold, thresholds)
+        except Exception:
+            return [(None, float('inf'))] * len(hands)
+
+    def find_matching_motion(self, hand, motion_bank, threshold=0.3):
+        self.history.push(hand.landmark, self.normalize_landmarks(hand.landmark))
+        if not len(motion_bank): return None, float('inf')
+        with self.stats.stage("motion.match"):
+            return motion_bank.match(self.history.trajectory(), threshold)
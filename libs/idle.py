@@ -0,0 +1,79 @@
+import time
+
+import cv2
+
+class IdleGate:
+    def __init__(self, idle_after=5.0, idle_fps=5, motion_threshold=0.02, pixel_delta=18, size=(64, 48)):
+        self.idle_after = idle_after
+        self.idle_fps = idle_fps
+        self.motion_threshold = motion_threshold
+        self.pixel_delta = pixel_delta
+        self.size = size
+        self.idle = False
+        self.last_seen = None
+        self.prev = None
+        self.prev_ts = None
+        self.wake_ts = None
+        self.wake_frame = None
+        self.wakeups = 0
+        self.wake_latencies = []
+        self.idle_wall = 0.0
+        self.idle_cpu = 0.0
+        self._enter_wall = self._enter_cpu = 0.0
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(
+            settings.get("idle_after", 5.0),
+            settings.get("idle_fps", 5),
+            settings.get("idle_motion_threshold", 0.02)
+        )
+
+    @property
+    def interval(self):
+        return 1.0 / self.idle_fps if self.idle and self.idle_fps > 0 else 0.0
+
+    def _small(self, image):
+        gray = cv2.cvtColor(cv2.resize(image, self.size, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(gray, (5, 5), 0)
+
+    def observe(self, has_hands, ts):
+        if self.wake_ts is not None and ts > self.wake_frame:
+            self.wake_latencies.append(ts - self.wake_ts)
+            self.wake_ts = None
+        if has_hands or self.last_seen is None:
+            self.last_seen = ts
+            return False
+        if self.idle_after <= 0 or ts - self.last_seen < self.idle_after: return False
+        self.idle = True
+        self.prev = self.prev_ts = None
+        self._enter_wall, self._enter_cpu = time.monotonic(), time.process_time()
+        return True
+
+    def check(self, image, ts):
+        small = self._small(image)
+        prev, self.prev = self.prev, small
+        prev_ts, self.prev_ts = self.prev_ts, ts
+        if prev is None: return False
+        changed = cv2.countNonZero(cv2.threshold(cv2.absdiff(small, prev), self.pixel_delta, 255, cv2.THRESH_BINARY)[1])
+        if changed < self.motion_threshold * small.size: return False
+        self.wake(ts, prev_ts)
+        return True
+
+    # latency runs from the last idle sample before the motion to the first full-rate frame
+    def wake(self, ts=None, since=None):
+        if not self.idle: return
+        self.idle = False
+        self.idle_wall += time.monotonic() - self._enter_wall
+        self.idle_cpu += time.process_time() - self._enter_cpu
+        self.last_seen = ts if ts is not None else time.monotonic()
+        self.wake_frame = self.last_seen
+        self.wake_ts = since if since is not None else self.last_seen
+        self.wakeups += 1
+
+    def cpu_percent(self):
+        wall, cpu = self.idle_wall, self.idle_cpu
+        if self.idle:
+            wall += time.monotonic() - self._enter_wall
+            cpu += time.process_time() - self._enter_cpu
+        return 100.0 * cpu / wall if wall > 0 else 0.0
@@ -0,0 +1,175 @@
+import multiprocessing as mp
+import queue
+import time
+from collections import namedtuple
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from libs.flow_tracker import TrackedResults
+from libs.recording import LABELS, Point, Hand
+
+try:
+    from mediapipe.framework.formats import landmark_pb2
+except ImportError:
+    landmark_pb2 = None
+
+Classification = namedtuple("Classification", ["label", "score"])
+ClassificationList = namedtuple("ClassificationList", ["classification"])
+
+ROW = 22
+
+def _new_hand(pts):
+    if landmark_pb2 is None:
+        return Hand([Point(float(x), float(y), float(z)) for x, y, z in pts])
+    hand = landmark_pb2.NormalizedLandmarkList()
+    for x, y, z in pts: hand.landmark.add(x=float(x), y=float(y), z=float(z))
+    return hand
+
+def _worker(frame_name, result_name, shape, slots, max_hands, engine_kwargs, req, resp):
+    from libs.gesture_engine import GestureEngine
+    engine = GestureEngine(max_hands=max_hands, **engine_kwargs)
+    fshm = shared_memory.SharedMemory(name=frame_name)
+    rshm = shared_memory.SharedMemory(name=result_name)
+    frames = np.ndarray((slots,) + shape, dtype=np.uint8, buffer=fshm.buf)
+    out = np.ndarray((slots, max_hands, ROW, 3), dtype=np.float32, buffer=rshm.buf)
+    resp.put(("ready", 0, 0, 0.0))
+    try:
+        while True:
+            msg = req.get()
+            if msg is None: break
+            slot, seq = msg
+            t0 = time.perf_counter()
+            results = engine.process_frame(frames[slot])
+            hands = results.multi_hand_landmarks if results else None
+            n = min(len(hands), max_hands) if hands else 0
+            for i in range(n):
+                out[slot, i, :21] = [(lm.x, lm.y, lm.z) for lm in hands[i].landmark]
+                label, score = None, 0.0
+                if results.multi_handedness:
+                    c = results.multi_handedness[i].classification[0]
+                    label, score = c.label, c.score
+                out[slot, i, 21] = (LABELS.index(label) if label in LABELS else 0, score, 0)
+            resp.put((slot, seq, n, time.perf_counter() - t0))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        del frames, out
+        fshm.close()
+        rshm.close()
+
+class InferenceWorker:
+    def __init__(self, max_hands=1, slots=2, timeout=1.0, start_timeout=60.0, max_restarts=3, **engine_kwargs):
+        self.max_hands = max_hands
+        self.slots = slots
+        self.timeout = timeout
+        self.start_timeout = start_timeout
+        self.max_restarts = max_restarts
+        self.restarts = 0
+        self.engine_kwargs = engine_kwargs
+        self.ctx = mp.get_context("spawn")
+        self.proc = None
+        self.shape = None
+        self.seq = 0
+        self.submitted = 0
+        self.completed = 0
+        self.dropped = 0
+        self.late = 0
+        self.worker_time = 0.0
+
+    def start(self, shape):
+        self.stop()
+        self.shape = tuple(shape)
+        size = int(np.prod(self.shape))
+        self.fshm = shared_memory.SharedMemory(create=True, size=self.slots * size)
+        self.rshm = shared_memory.SharedMemory(create=True, size=self.slots * self.max_hands * ROW * 3 * 4)
+        self.frames = np.ndarray((self.slots,) + self.shape, dtype=np.uint8, buffer=self.fshm.buf)
+        self.out = np.ndarray((self.slots, self.max_hands, ROW, 3), dtype=np.float32, buffer=self.rshm.buf)
+        self.req = self.ctx.Queue()
+        self.resp = self.ctx.Queue()
+        self.free = list(range(self.slots))
+        self.pending = {}
+        self.proc = self.ctx.Process(
+            target=_worker, name="InferenceWorker", daemon=True,
+            args=(self.fshm.name, self.rshm.name, self.shape, self.slots, self.max_hands, self.engine_kwargs, self.req, self.resp)
+        )
+        self.proc.start()
+        deadline = time.monotonic() + self.start_timeout
+        while True:
+            try:
+                msg = self.resp.get(timeout=0.1)
+                break
+            except queue.Empty:
+                pass
+            if not self.proc.is_alive():
+                code = self.proc.exitcode
+                self.stop()
+                raise RuntimeError(f"процесс распознавания завершился при запуске (код {code})")
+            if time.monotonic() > deadline:
+                self.stop()
+                raise RuntimeError(f"процесс распознавания не ответил за {self.start_timeout:.0f} с")
+        if msg[0] != "ready":
+            self.stop()
+            raise RuntimeError("процесс распознавания не запустился")
+        print(f"[Worker] Распознавание вынесено в процесс {self.proc.pid}")
+        return self
+
+    def _unpack(self, slot, n):
+        hands, labels = [], []
+        for i in range(n):
+            data = self.out[slot, i]
+            hands.append(_new_hand(data[:21]))
+            labels.append(ClassificationList([Classification(LABELS[int(data[21, 0])], float(data[21, 1]))]))
+        return TrackedResults(hands, labels) if n else TrackedResults(None, None)
+
+    def _collect(self, timeout, until=None):
+        found = None
+        deadline = time.monotonic() + timeout
+        while self.pending:
+            remaining = deadline - time.monotonic()
+            try:
+                slot, seq, n, dt = self.resp.get(timeout=remaining) if remaining > 0 else self.resp.get_nowait()
+            except queue.Empty:
+                break
+            results = self._unpack(slot, n)
+            del self.pending[seq]
+            self.free.append(slot)
+            self.completed += 1
+            self.worker_time += dt
+            if seq == until:
+                found = results
+                break
+            self.late += 1
+        return found
+
+    def process_frame(self, frame):
+        if self.proc is not None and not self.proc.is_alive():
+            if self.restarts >= self.max_restarts:
+                raise RuntimeError(f"процесс распознавания завершился (код {self.proc.exitcode}), перезапуски исчерпаны")
+            self.restarts += 1
+            print(f"[Worker] Процесс распознавания завершился (код {self.proc.exitcode}), перезапуск {self.restarts}/{self.max_restarts}")
+            self.stop()
+        if self.proc is None or frame.shape != self.shape: self.start(frame.shape)
+        self._collect(0)
+        if not self.free:
+            self.dropped += 1
+            return None
+        slot = self.free.pop()
+        np.copyto(self.frames[slot], frame)
+        self.seq += 1
+        self.pending[self.seq] = slot
+        self.req.put((slot, self.seq))
+        self.submitted += 1
+        return self._collect(self.timeout, self.seq)
+
+    def stop(self):
+        if self.proc is None: return
+        if self.proc.is_alive():
+            self.req.put(None)
+            self.proc.join(timeout=2.0)
+        if self.proc.is_alive(): self.proc.terminate()
+        self.proc = None
+        del self.frames, self.out
+        for shm in (self.fshm, self.rshm):
+            shm.close()
+            shm.unlink()
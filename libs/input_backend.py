@@ -0,0 +1,221 @@
+import platform
+import threading
+import time
+from collections import deque
+
+X_KEYS = {
+    "ctrl": "Control_L", "control": "Control_L", "alt": "Alt_L", "shift": "Shift_L",
+    "win": "Super_L", "command": "Super_L", "super": "Super_L",
+    "enter": "Return", "return": "Return", "esc": "Escape", "escape": "Escape",
+    "tab": "Tab", "space": "space", "backspace": "BackSpace", "delete": "Delete", "del": "Delete",
+    "up": "Up", "down": "Down", "left": "Left", "right": "Right",
+    "home": "Home", "end": "End", "pageup": "Prior", "pagedown": "Next",
+    "volumeup": "XF86_AudioRaiseVolume", "volumedown": "XF86_AudioLowerVolume", "volumemute": "XF86_AudioMute",
+    "playpause": "XF86_AudioPlay", "nexttrack": "XF86_AudioNext", "prevtrack": "XF86_AudioPrev", "stop": "XF86_AudioStop",
+    "pgup": "Prior", "pgdn": "Next", "insert": "Insert", "pause": "Pause", "menu": "Menu", "apps": "Menu",
+    "capslock": "Caps_Lock", "numlock": "Num_Lock", "scrolllock": "Scroll_Lock",
+    "printscreen": "Print", "prntscrn": "Print", "prtsc": "Print", "prtscr": "Print", "print": "Print",
+    "ctrlleft": "Control_L", "ctrlright": "Control_R", "altleft": "Alt_L", "altright": "Alt_R",
+    "shiftleft": "Shift_L", "shiftright": "Shift_R", "winleft": "Super_L", "winright": "Super_R",
+    "option": "Alt_L", "optionleft": "Alt_L", "optionright": "Alt_R",
+    "add": "KP_Add", "subtract": "KP_Subtract", "multiply": "KP_Multiply", "divide": "KP_Divide",
+    "decimal": "KP_Decimal", "separator": "KP_Separator",
+    "browserback": "XF86_Back", "browserforward": "XF86_Forward", "browserrefresh": "XF86_Refresh",
+    "browserhome": "XF86_HomePage", "browsersearch": "XF86_Search", "browserfavorites": "XF86_Favorites",
+    "browserstop": "XF86_Stop", "launchmail": "XF86_Mail", "launchmediaselect": "XF86_AudioMedia", "sleep": "XF86_Sleep",
+    "+": "plus", "-": "minus", "=": "equal", ",": "comma", ".": "period", "/": "slash", "\\": "backslash",
+    ";": "semicolon", "'": "apostrophe", "`": "grave", "[": "bracketleft", "]": "bracketright",
+    "!": "exclam", "@": "at", "#": "numbersign", "$": "dollar", "%": "percent", "^": "asciicircum",
+    "&": "ampersand", "*": "asterisk", "(": "parenleft", ")": "parenright", "_": "underscore",
+    ":": "colon", '"': "quotedbl", "<": "less", ">": "greater", "?": "question",
+    "{": "braceleft", "}": "braceright", "|": "bar", "~": "asciitilde", " ": "space",
+}
+X_KEYS.update({f"f{i}": f"F{i}" for i in range(1, 25)})
+X_KEYS.update({f"num{i}": f"KP_{i}" for i in range(10)})
+
+def x_keysym(key):
+    from Xlib import XK
+    if not hasattr(XK, "XK_XF86_AudioPlay"): XK.load_keysym_group("xf86")
+    for name in (X_KEYS.get(key.lower()), key, key.lower()):
+        sym = XK.string_to_keysym(name) if name else 0
+        if sym: return sym
+    return 0
+
+class PyAutoGuiBackend:
+    name = "pyautogui"
+
+    def __init__(self):
+        import pyautogui
+        pyautogui.FAILSAFE = False
+        pyautogui.PAUSE = 0
+        self.pg = pyautogui
+
+    def move_rel(self, dx, dy): self.pg.moveRel(dx, dy, _pause=False)
+    def mouse_down(self): self.pg.mouseDown(_pause=False)
+    def mouse_up(self): self.pg.mouseUp(_pause=False)
+    def click(self, button="left", clicks=1): self.pg.click(button=button, clicks=clicks, _pause=False)
+    def key_down(self, key): self.pg.keyDown(key, _pause=False)
+    def key_up(self, key): self.pg.keyUp(key, _pause=False)
+    def press(self, key): self.pg.press(key, _pause=False)
+    def hotkey(self, *keys): self.pg.hotkey(*keys, _pause=False)
+
+class XlibBackend:
+    name = "xlib"
+    BUTTONS = {"left": 1, "middle": 2, "right": 3}
+
+    def __init__(self):
+        from Xlib import X, display
+        from Xlib.ext import xtest
+        self.X, self.xtest = X, xtest
+        self.d = display.Display()
+        if not self.d.has_extension("XTEST"):
+            raise RuntimeError("XTEST недоступен")
+        self.lock = threading.Lock()
+
+    def _fake(self, event, detail=0, x=0, y=0):
+        with self.lock:
+            self.xtest.fake_input(self.d, event, detail=detail, x=x, y=y)
+            self.d.sync()
+
+    def _keycode(self, key):
+        sym = x_keysym(key)
+        code = self.d.keysym_to_keycode(sym) if sym else 0
+        if not code: raise ValueError(f"неизвестная клавиша '{key}'")
+        return code
+
+    def move_rel(self, dx, dy): self._fake(self.X.MotionNotify, True, int(dx), int(dy))
+    def mouse_down(self): self._fake(self.X.ButtonPress, 1)
+    def mouse_up(self): self._fake(self.X.ButtonRelease, 1)
+
+    def click(self, button="left", clicks=1):
+        b = self.BUTTONS[button]
+        for _ in range(clicks):
+            self._fake(self.X.ButtonPress, b)
+            self._fake(self.X.ButtonRelease, b)
+
+    def key_down(self, key): self._fake(self.X.KeyPress, self._keycode(key))
+    def key_up(self, key): self._fake(self.X.KeyRelease, self._keycode(key))
+
+    def press(self, key):
+        self.key_down(key)
+        self.key_up(key)
+
+    def hotkey(self, *keys):
+        codes = [self._keycode(k) for k in keys]
+        pressed = []
+        try:
+            for code in codes:
+                self._fake(self.X.KeyPress, code)
+                pressed.append(code)
+        finally:
+            for code in reversed(pressed): self._fake(self.X.KeyRelease, code)
+
+class RecordingBackend:
+    name = "recording"
+
+    def __init__(self, limit=None):
+        self.events = deque(maxlen=limit)
+
+    def _log(self, event, *args):
+        self.events.append((time.monotonic(), event, args))
+
+    def move_rel(self, dx, dy): self._log("move_rel", dx, dy)
+    def mouse_down(self): self._log("mouse_down")
+    def mouse_up(self): self._log("mouse_up")
+    def click(self, button="left", clicks=1): self._log("click", button, clicks)
+    def key_down(self, key): self._log("key_down", key)
+    def key_up(self, key): self._log("key_up", key)
+    def press(self, key): self._log("press", key)
+    def hotkey(self, *keys): self._log("hotkey", *keys)
+
+def make_backend(kind="auto"):
+    if kind == "recording": return RecordingBackend()
+    if kind in ("auto", "xlib") and platform.system() == "Linux":
+        try:
+            return XlibBackend()
+        except Exception as e:
+            if kind == "xlib": print(f"[Input] Xlib недоступен ({e}), используется pyautogui")
+    try:
+        return PyAutoGuiBackend()
+    except Exception as e:
+        if kind == "pyautogui": raise
+        print(f"[Input] Нет доступа к дисплею ({e!r}), ввод отключён: действия только записываются")
+        return RecordingBackend(limit=256)
+
+class CursorMotion:
+    def __init__(self, backend, rate=240.0):
+        self.backend = backend
+        self.rate = rate
+        self.cond = threading.Condition()
+        self.pending_x = self.pending_y = 0.0
+        self.carry_x = self.carry_y = 0.0
+        self.deadline = 0.0
+        self.span = 1 / 30
+        self.last_push = None
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        if self.rate <= 0 or self.running: return self
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, name="CursorMotion", daemon=True)
+        self.thread.start()
+        return self
+
+    def move_rel(self, dx, dy):
+        if not self.running:
+            self.backend.move_rel(dx, dy)
+            return
+        now = time.monotonic()
+        with self.cond:
+            if self.last_push is not None:
+                self.span += 0.2 * (min(max(now - self.last_push, 1 / 120), 0.1) - self.span)
+            self.last_push = now
+            self.pending_x += dx
+            self.pending_y += dy
+            self.deadline = now + self.span
+            self.cond.notify()
+
+    def _emit(self, fx, fy):
+        self.carry_x += fx
+        self.carry_y += fy
+        ix, iy = int(self.carry_x), int(self.carry_y)
+        if ix or iy:
+            self.carry_x -= ix
+            self.carry_y -= iy
+            self.backend.move_rel(ix, iy)
+
+    def _loop(self):
+        tick = 1.0 / self.rate
+        while self.running:
+            with self.cond:
+                while self.running and not (self.pending_x or self.pending_y):
+                    self.cond.wait()
+                remaining = self.deadline - time.monotonic()
+                frac = 1.0 if remaining <= tick else tick / remaining
+                fx, fy = self.pending_x * frac, self.pending_y * frac
+                self.pending_x -= fx
+                self.pending_y -= fy
+                if frac == 1.0: self.pending_x = self.pending_y = 0.0
+            self._emit(fx, fy)
+            time.sleep(tick)
+
+    def flush(self):
+        with self.cond:
+            fx, fy = self.pending_x, self.pending_y
+            self.pending_x = self.pending_y = 0.0
+        self._emit(fx, fy)
+
+    def mouse_down(self):
+        self.flush()
+        self.backend.mouse_down()
+
+    def mouse_up(self):
+        self.flush()
+        self.backend.mouse_up()
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        if self.thread: self.thread.join(timeout=1.0)
@@ -0,0 +1,152 @@
+import numpy as np
+
+MOTION_LEN = 32
+HISTORY_LEN = 30
+ANCHOR = 9
+
+def resample(seq, length=MOTION_LEN):
+    seq = np.asarray(seq, dtype=np.float32)
+    if len(seq) == length: return seq
+    src = np.linspace(0, len(seq) - 1, length)
+    idx = np.arange(len(seq))
+    return np.stack([np.interp(src, idx, seq[:, d]) for d in range(seq.shape[1])], axis=1).astype(np.float32)
+
+class LandmarkHistory:
+    def __init__(self, size=HISTORY_LEN):
+        self.size = size
+        self.norm = np.zeros((size, 21, 2), dtype=np.float32)
+        self.anchor = np.zeros((size, 2), dtype=np.float32)
+        self.scale = np.zeros(size, dtype=np.float32)
+        self.pos = 0
+        self.count = 0
+
+    def clear(self):
+        self.count = 0
+
+    def push(self, landmarks, normalized):
+        i = self.pos
+        a, w = landmarks[ANCHOR], landmarks[0]
+        self.norm[i] = normalized
+        self.anchor[i] = (a.x, a.y)
+        self.scale[i] = np.hypot(a.x - w.x, a.y - w.y)
+        self.pos = (i + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def _ordered(self, arr):
+        if self.count < self.size: return arr[:self.count]
+        return np.concatenate((arr[self.pos:], arr[:self.pos]))
+
+    def trajectory(self):
+        if self.count < self.size: return None
+        anchor = self._ordered(self.anchor)
+        scale = float(self.scale.mean()) or 1.0
+        return resample((anchor - anchor[-1]) / scale)
+
+class MotionBank:
+    def __init__(self, motions=None, band=4, max_candidates=16, min_travel=1.0):
+        self.band = band
+        self.max_candidates = max_candidates
+        self.min_travel = min_travel
+        self.names = []
+        self.index = {}
+        self.data = np.zeros((0, MOTION_LEN, 2), dtype=np.float32)
+        self.upper = self.data
+        self.lower = self.data
+        self.last_candidates = 0
+        self._diag_cache = None
+        if motions: self.rebuild(motions)
+
+    def __len__(self):
+        return len(self.names)
+
+    def _envelope(self):
+        n = len(self.names)
+        self.upper = np.empty_like(self.data)
+        self.lower = np.empty_like(self.data)
+        for i in range(MOTION_LEN):
+            lo, hi = max(0, i - self.band), min(MOTION_LEN, i + self.band + 1)
+            self.upper[:, i] = self.data[:, lo:hi].max(axis=1) if n else 0
+            self.lower[:, i] = self.data[:, lo:hi].min(axis=1) if n else 0
+
+    def rebuild(self, motions):
+        items = [(k, resample(v)) for k, v in motions.items() if v is not None and len(v) > 1]
+        self.names = [k for k, _ in items]
+        self.index = {k: i for i, k in enumerate(self.names)}
+        self.data = np.array([v for _, v in items], dtype=np.float32).reshape(-1, MOTION_LEN, 2)
+        self._envelope()
+
+    def add(self, name, seq):
+        motions = dict(zip(self.names, self.data))
+        motions[name] = seq
+        self.rebuild(motions)
+
+    def remove(self, name):
+        if name not in self.index: return False
+        motions = dict(zip(self.names, self.data))
+        del motions[name]
+        self.rebuild(motions)
+        return True
+
+    def lower_bounds(self, query):
+        over = np.maximum(query - self.upper, 0) + np.maximum(self.lower - query, 0)
+        return np.sqrt((over * over).sum(axis=2)).sum(axis=1)
+
+    def _diagonals(self):
+        if self._diag_cache and self._diag_cache[0] == self.band:
+            return self._diag_cache[1]
+        n, r, w = MOTION_LEN, self.band, MOTION_LEN + 1
+        diags = []
+        for s in range(2, 2 * n + 1):
+            i = np.arange(max(1, s - n), min(n, s - 1) + 1)
+            j = s - i
+            keep = np.abs(i - j) <= r
+            i, j = i[keep], j[keep]
+            if len(i):
+                diags.append((i * w + j, (i - 1) * w + j - 1, (i - 1) * w + j, i * w + j - 1, (i - 1) * n + j - 1))
+        self._diag_cache = (self.band, diags)
+        return diags
+
+    def _dtw(self, query, cand, limit):
+        k, n = len(cand), MOTION_LEN
+        diff = query[None, :, None, :] - self.data[cand][:, None, :, :]
+        cost = np.sqrt((diff * diff).sum(axis=3)).reshape(k, n * n)
+        D = np.full((k, (n + 1) * (n + 1)), np.inf, dtype=np.float32)
+        D[:, 0] = 0
+        alive = np.ones(k, dtype=bool)
+        prev = None
+        for step, (cur, dd, up, left, c) in enumerate(self._diagonals()):
+            best = np.minimum(np.minimum(D[:, dd], D[:, up]), D[:, left])
+            best += cost[:, c]
+            D[:, cur] = best
+            if prev is not None and step % 4 == 0:
+                alive &= np.minimum(best.min(axis=1), prev.min(axis=1)) <= limit
+                if not alive.any(): break
+            prev = best
+        total = D[:, -1]
+        total[~alive] = np.inf
+        return total
+
+    def match(self, query, threshold):
+        self.last_candidates = 0
+        if query is None or not self.names: return None, float('inf')
+        travel = float(np.linalg.norm(np.diff(query, axis=0), axis=1).sum())
+        if travel < self.min_travel: return None, float('inf')
+
+        limit = threshold * 2 * MOTION_LEN
+        lb = self.lower_bounds(query)
+        order = np.argsort(lb)
+        order = order[lb[order] <= limit]
+        best, best_total = None, np.inf
+        for start in range(0, len(order), self.max_candidates):
+            cand = order[start:start + self.max_candidates]
+            if lb[cand[0]] > best_total: break
+            totals = self._dtw(query, cand, min(limit, best_total))
+            self.last_candidates += len(cand)
+            i = int(np.argmin(totals))
+            if totals[i] < best_total: best, best_total = int(cand[i]), float(totals[i])
+        if best is None: return None, float('inf')
+
+        dist = best_total / (2 * MOTION_LEN)
+        if dist < threshold:
+            return self.names[best], dist
+        return None, dist
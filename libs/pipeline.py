@@ -0,0 +1,59 @@
+import time
+from collections import namedtuple
+
+import cv2
+
+from libs.gesture_engine import GestureEngine
+from libs.flow_tracker import FlowTracker
+from libs.inference_worker import InferenceWorker
+
+FrameResult = namedtuple("FrameResult", ["frame", "hands", "handedness", "out", "woke", "slept"])
+
+def build_engine(settings):
+    engine_kwargs = dict(
+        roi_mode=settings.get("roi_mode", False),
+        inference_size=settings.get("inference_size", 320),
+        roi_margin=settings.get("roi_margin", 0.3)
+    )
+    worker = InferenceWorker(settings.get("max_hands", 1), **engine_kwargs) if settings.get("inference_process", False) else None
+    return GestureEngine(
+        max_hands=settings.get("max_hands", 1),
+        flow=FlowTracker.from_settings(settings) if settings.get("flow_tracking", False) else None,
+        worker=worker,
+        **engine_kwargs
+    )
+
+class FramePipeline:
+    def __init__(self, engine, session, idle, grabber, stats, recorder=None):
+        self.engine = engine
+        self.session = session
+        self.idle = idle
+        self.grabber = grabber
+        self.stats = stats
+        self.recorder = recorder
+
+    def process(self, captured, title):
+        stats, idle, engine = self.stats, self.idle, self.engine
+        stats.tick(captured.ts)
+        woke = False
+        if idle.idle:
+            with stats.stage("idle.motion"):
+                woke = idle.check(captured.image, captured.ts)
+            if woke: self.grabber.interval = 0.0
+        frame = cv2.flip(captured.image, 1)
+        h, w = frame.shape[:2]
+
+        results = engine.process_frame(frame) if not idle.idle else None
+        hands = results.multi_hand_landmarks if results else None
+        handedness = [c.classification[0].label for c in results.multi_handedness] if hands and results.multi_handedness else None
+        slept = not idle.idle and idle.observe(bool(hands), captured.ts)
+        if slept:
+            self.grabber.interval = idle.interval
+            engine.reset_tracking()
+            engine.history.clear()
+        if self.recorder: self.recorder.write(captured.ts, w, h, title, hands, handedness)
+
+        with self.session.cfg.lock, stats.stage("session.step"):
+            out = self.session.step(hands, w, h, title, captured.ts, handedness, time.monotonic() - captured.ts)
+        if out.fired: stats.action_latency(captured.ts)
+        return FrameResult(frame, hands, handedness, out, woke, slept)
@@ -0,0 +1,140 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from libs.stats import NULL_STATS
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+KEYS_TEXT = "KEYS: S(Save) L(List) O(Opts) Q(Quit)"
+
+def draw_ui_text(img, text, pos, color, scale=0.7, thickness=1, pad=10):
+    x, y = pos
+    (w, h), baseline = cv2.getTextSize(text, FONT, scale, thickness)
+    cv2.rectangle(img, (x - pad, y - h - pad), (x + w + pad, y + pad), (0, 0, 0), -1)
+    cv2.rectangle(img, (x - pad, y - h - pad), (x + w + pad, y + pad), color, 1)
+    cv2.putText(img, text, (x, y), FONT, scale, color, thickness, cv2.LINE_AA)
+
+class TextLayer:
+    def __init__(self, color, pad=10):
+        self.color = color
+        self.pad = pad
+        self.cache = {}
+
+    def _patch(self, text):
+        patch = self.cache.get(text)
+        if patch is None:
+            (w, h), _ = cv2.getTextSize(text, FONT, 0.7, 1)
+            patch = np.zeros((h + 2 * self.pad + 1, w + 2 * self.pad + 1, 3), dtype=np.uint8)
+            draw_ui_text(patch, text, (self.pad, h + self.pad), self.color, pad=self.pad)
+            if len(self.cache) > 64: self.cache.clear()
+            self.cache[text] = patch
+        return patch
+
+    def blit(self, img, text, pos):
+        patch = self._patch(text)
+        x0, y0 = pos[0] - self.pad, pos[1] - patch.shape[0] + self.pad + 1
+        ih, iw = img.shape[:2]
+        x1, y1 = min(x0 + patch.shape[1], iw), min(y0 + patch.shape[0], ih)
+        if x0 < 0 or y0 < 0 or x1 <= x0 or y1 <= y0: return
+        img[y0:y1, x0:x1] = patch[:y1 - y0, :x1 - x0]
+
+class PreviewRenderer:
+    def __init__(self, engine, color, window="GestureCam", fps=30, stats=NULL_STATS):
+        self.engine = engine
+        self.window = window
+        self.interval = 1.0 / fps if fps > 0 else 0.0
+        self.stats = stats
+        self.text = TextLayer(color)
+        self.cond = threading.Condition()
+        self.latest = None
+        self.version = 0
+        self.composed = None
+        self.composed_version = 0
+        self.shown = 0
+        self.rendered = 0
+        self.opened = False
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        if self.running: return self
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, name="PreviewRenderer", daemon=True)
+        self.thread.start()
+        return self
+
+    def submit(self, frame, hands=None, out=None, stats_txt=""):
+        with self.cond:
+            self.latest = (frame, hands, out, stats_txt, None)
+            self.version += 1
+            self.cond.notify()
+
+    def show(self, image):
+        with self.cond:
+            self.latest = (image, None, None, "", image)
+            self.version += 1
+            self.cond.notify()
+
+    def _compose(self, frame, hands, out, stats_txt):
+        h, w = frame.shape[:2]
+        if hands:
+            for lm in hands:
+                self.engine.mp_draw.draw_landmarks(frame, lm, self.engine.mp_hands.HAND_CONNECTIONS,
+                                                   landmark_drawing_spec=self.engine.draw_spec)
+        if out is not None:
+            if out.cursor:
+                if out.pinch: cv2.circle(frame, out.cursor, 15, (0, 0, 255), -1)
+                else: cv2.circle(frame, out.cursor, 10, (0, 255, 255), -1)
+            if out.progress is not None:
+                bw = int(out.progress * 200)
+                cv2.rectangle(frame, (20, h-40), (220, h-30), (50, 50, 50), -1)
+                cv2.rectangle(frame, (20, h-40), (20+bw, h-30), (0, 255, 0), -1)
+            if out.fired and out.fired != "special:toggle_follow":
+                cv2.rectangle(frame, (0, 0), (w, h), (0, 255, 0), 10)
+        self.text.blit(frame, KEYS_TEXT, (10, 30))
+        if stats_txt: self.text.blit(frame, stats_txt, (10, 70))
+        return frame
+
+    def _loop(self):
+        seen = 0
+        next_due = 0.0
+        while self.running:
+            with self.cond:
+                self.cond.wait_for(lambda: self.version != seen or not self.running, 0.05)
+                if not self.running: break
+                item, version = self.latest, self.version
+            if version != seen and item is not None:
+                seen = version
+                t0 = time.perf_counter()
+                frame, hands, out, stats_txt, raw = item
+                image = raw if raw is not None else self._compose(frame, hands, out, stats_txt)
+                with self.cond:
+                    self.composed = image
+                    self.composed_version += 1
+                self.rendered += 1
+                self.stats.add("render", time.perf_counter() - t0)
+            now = time.monotonic()
+            if now < next_due: time.sleep(next_due - now)
+            next_due = max(next_due + self.interval, time.monotonic())
+
+    # HighGUI must only be touched from the main thread (macOS)
+    def present(self):
+        if not self.opened:
+            cv2.namedWindow(self.window, cv2.WINDOW_NORMAL)
+            cv2.resizeWindow(self.window, 640, 480)
+            self.opened = True
+        with self.cond:
+            image, version = self.composed, self.composed_version
+        if image is not None and version != self.shown:
+            self.shown = version
+            cv2.imshow(self.window, image)
+        cv2.waitKey(1)
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        if self.thread: self.thread.join(timeout=1.0)
+        if self.opened: cv2.destroyWindow(self.window)
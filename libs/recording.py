@@ -0,0 +1,52 @@
+import struct
+from collections import namedtuple
+
+import numpy as np
+
+MAGIC = b"GCRC"
+VERSION = 2
+LABELS = (None, "Left", "Right")
+HEADER = struct.Struct("<4sH")
+FRAME = struct.Struct("<dHHBH")
+
+Point = namedtuple("Point", ["x", "y", "z"])
+Hand = namedtuple("Hand", ["landmark"])
+RecordedFrame = namedtuple("RecordedFrame", ["ts", "w", "h", "title", "hands", "handedness"])
+
+class LandmarkRecorder:
+    def __init__(self, path):
+        self.f = open(path, "wb")
+        self.f.write(HEADER.pack(MAGIC, VERSION))
+        self.frames = 0
+
+    def write(self, ts, w, h, title, hands, handedness=None):
+        hands = hands or []
+        labels = handedness or [None] * len(hands)
+        title_b = (title or "").encode("utf-8")[:0xFFFF]
+        self.f.write(FRAME.pack(ts, w, h, len(hands), len(title_b)))
+        self.f.write(title_b)
+        for hand, label in zip(hands, labels):
+            self.f.write(bytes([LABELS.index(label) if label in LABELS else 0]))
+            arr = np.array([[lm.x, lm.y, lm.z] for lm in hand.landmark], dtype=np.float32)
+            self.f.write(arr.tobytes())
+        self.frames += 1
+
+    def close(self):
+        self.f.close()
+
+def read_recording(path):
+    with open(path, "rb") as f:
+        magic, version = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version not in (1, VERSION):
+            raise ValueError(f"Неизвестный формат записи: {path}")
+        while True:
+            raw = f.read(FRAME.size)
+            if len(raw) < FRAME.size: return
+            ts, w, h, n_hands, title_len = FRAME.unpack(raw)
+            title = f.read(title_len).decode("utf-8")
+            hands, labels = [], []
+            for _ in range(n_hands):
+                labels.append(LABELS[f.read(1)[0]] if version >= 2 else None)
+                arr = np.frombuffer(f.read(21 * 3 * 4), dtype=np.float32).reshape(21, 3)
+                hands.append(Hand([Point(float(x), float(y), float(z)) for x, y, z in arr]))
+            yield RecordedFrame(ts, w, h, title, hands, labels)
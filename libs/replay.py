@@ -0,0 +1,144 @@
+import json
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from libs.config_manager import ConfigManager
+from libs.flow_tracker import FlowTracker, TrackedResults
+from libs.gesture_engine import GestureEngine
+from libs.recording import read_recording
+from libs.session import GestureSession
+
+class RecordingExecutor:
+    def __init__(self, trace):
+        self.trace = trace
+        self.frame = 0
+
+    def submit(self, plan, tag=None, replace=True):
+        self.trace.append({"frame": self.frame, "event": "action", "gesture": tag, "action": plan.source})
+        return True
+
+class RecordingMouse:
+    def __init__(self, trace, executor):
+        self.trace = trace
+        self.executor = executor
+
+    def _log(self, event, **kw):
+        self.trace.append({"frame": self.executor.frame, "event": event, **kw})
+
+    def move_rel(self, dx, dy):
+        self._log("move", dx=round(dx, 3), dy=round(dy, 3))
+
+    def mouse_down(self):
+        self._log("mouse_down")
+
+    def mouse_up(self):
+        self._log("mouse_up")
+
+def run_replay(path, trace_path=None, timings_path=None, latency=0.0):
+    cfg = ConfigManager(read_only=True)
+    engine = GestureEngine(load_model=False, max_hands=cfg.config["settings"].get("max_hands", 1))
+    trace = []
+    executor = RecordingExecutor(trace)
+    session = GestureSession(engine, cfg, executor, RecordingMouse(trace, executor))
+
+    timings = []
+    start = time.perf_counter()
+    for i, rec in enumerate(read_recording(path)):
+        executor.frame = i
+        t0 = time.perf_counter()
+        session.step(rec.hands, rec.w, rec.h, rec.title, rec.ts, rec.handedness, latency)
+        timings.append(time.perf_counter() - t0)
+    total = time.perf_counter() - start
+
+    out = open(trace_path, "w", encoding="utf-8") if trace_path else sys.stdout
+    try:
+        for entry in trace:
+            out.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    finally:
+        if trace_path: out.close()
+
+    if timings_path:
+        with open(timings_path, "w", encoding="utf-8") as f:
+            f.write("frame,us\n")
+            for i, dt in enumerate(timings):
+                f.write(f"{i},{dt * 1e6:.1f}\n")
+
+    if timings:
+        ms = sorted(t * 1000 for t in timings)
+        print(f"[Replay] Кадров: {len(ms)}, событий: {len(trace)}, "
+              f"всего {total:.3f}s, p50 {ms[len(ms) // 2]:.3f}ms, max {ms[-1]:.3f}ms", file=sys.stderr)
+        if cfg.bank.prune_queries:
+            print(f"[Replay] Каскад отсеял {cfg.bank.pruning_ratio():.1%} кандидатов", file=sys.stderr)
+    return trace, timings
+
+HAND_EDGES = [(0, 1), (1, 2), (2, 3), (3, 4), (0, 5), (5, 6), (6, 7), (7, 8), (5, 9), (9, 10), (10, 11), (11, 12),
+              (9, 13), (13, 14), (14, 15), (15, 16), (13, 17), (0, 17), (17, 18), (18, 19), (19, 20)]
+
+class RecordedModel:
+    def __init__(self, max_hands=1):
+        self.max_hands = max_hands
+        self.rec = None
+        self.calls = 0
+
+    def process(self, image):
+        self.calls += 1
+        n = self.max_hands
+        return TrackedResults(self.rec.hands[:n] or None, self.rec.handedness[:n] or None)
+
+def render_hands(rec, background):
+    frame = background.copy()
+    for hand in rec.hands:
+        pts = [(int(lm.x * rec.w), int(lm.y * rec.h)) for lm in hand.landmark]
+        for a, b in HAND_EDGES: cv2.line(frame, pts[a], pts[b], (90, 140, 200), 6, cv2.LINE_AA)
+        for i, p in enumerate(pts): cv2.circle(frame, p, 4, (40 + 10 * i, 250 - 10 * i, 120), -1, cv2.LINE_AA)
+    return frame
+
+def _names(engine, hands, cfg):
+    if not hands: return ()
+    settings = cfg.config["settings"]
+    matches = engine.find_matching_gestures(hands, cfg.bank, settings.get("threshold", 0.1),
+                                            settings.get("gesture_thresholds"), settings.get("knn_k", 5))
+    return tuple(name for name, _ in matches)
+
+def compare_flow(path):
+    cfg = ConfigManager(read_only=True)
+    settings = cfg.config["settings"]
+    max_hands = settings.get("max_hands", 1)
+    reference = GestureEngine(load_model=False, max_hands=max_hands)
+    engine = GestureEngine(load_model=False, max_hands=max_hands, flow=FlowTracker.from_settings(settings))
+    engine.hands = model = RecordedModel(max_hands)
+    rng = np.random.default_rng(0)
+
+    background = None
+    frames = hand_frames = agree = tracked = tracked_agree = 0
+    errors = []
+    for rec in read_recording(path):
+        if background is None or background.shape[:2] != (rec.h, rec.w):
+            background = rng.integers(0, 60, (rec.h, rec.w, 3), dtype=np.uint8)
+            engine.reset_tracking()
+        model.rec = rec
+        calls = model.calls
+        results = engine.process_frame(render_hands(rec, background))
+        hands = results.multi_hand_landmarks if results else None
+        expected, got = _names(reference, rec.hands[:max_hands], cfg), _names(engine, hands, cfg)
+        frames += 1
+        hand_frames += bool(rec.hands)
+        agree += expected == got
+        if model.calls == calls:
+            tracked += 1
+            tracked_agree += expected == got
+            for real, est in zip(rec.hands, hands or []):
+                errors.extend(np.hypot((a.x - b.x) * rec.w, (a.y - b.y) * rec.h) for a, b in zip(real.landmark, est.landmark))
+
+    report = {"frames": frames, "hand_frames": hand_frames, "agreement": agree / frames if frames else 1.0,
+              "tracked": tracked, "tracked_agreement": tracked_agree / tracked if tracked else 1.0,
+              "model_call_ratio": engine.flow.model_call_ratio(),
+              "landmark_error_px": float(np.mean(errors)) if errors else 0.0}
+    print(f"[Flow] Кадров: {frames} (с рукой {hand_frames}), через модель {report['model_call_ratio']:.0%}, "
+          f"совпадение жестов с моделью на каждом кадре: {report['agreement']:.1%}, "
+          f"на кадрах по потоку: {report['tracked_agreement']:.1%} ({tracked}), "
+          f"ошибка точек {report['landmark_error_px']:.1f}px", file=sys.stderr)
+    return report
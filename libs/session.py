@@ -0,0 +1,123 @@
+import numpy as np
+from libs.cursor_filter import CursorFilter
+
+COMBO_SEP = "&"
+
+class FrameOutcome:
+    def __init__(self):
+        self.gesture = None
+        self.progress = None
+        self.fired = None
+        self.cursor = None
+        self.pinch = False
+        self.motion = None
+
+class GestureSession:
+    def __init__(self, engine, cfg, executor, mouse):
+        self.engine = engine
+        self.cfg = cfg
+        self.executor = executor
+        self.mouse = mouse
+        self.is_following = False
+        self.is_dragging = False
+        self.prev_x, self.prev_y = None, None
+        self.curr_gest = None
+        self.gest_time = 0
+        self.triggered = False
+        self.cursor_filter = CursorFilter.from_settings(cfg.config["settings"])
+
+    def step(self, hands, w, h, active_app, now, handedness=None, latency=0.0):
+        out = FrameOutcome()
+        settings = self.cfg.config["settings"]
+
+        if hands:
+            labels = handedness or [None] * len(hands)
+            matches = self.engine.find_matching_gestures(hands, self.cfg.bank, settings.get("threshold", 0.1),
+                                                          settings.get("gesture_thresholds"), settings.get("knn_k", 5))
+            cursor_i = 0
+            gesture_idx = list(range(len(hands)))
+            cursor_hand = settings.get("cursor_hand")
+            if self.is_following and len(hands) > 1 and cursor_hand in labels:
+                cursor_i = labels.index(cursor_hand)
+                gesture_idx.remove(cursor_i)
+
+            if len(gesture_idx) == len(hands): out.gesture = self._combo(matches, labels, active_app)
+            if out.gesture is None:
+                out.gesture = next((matches[i][0] for i in gesture_idx if matches[i][0]), None)
+            if self.is_following:
+                self._track(hands[cursor_i], w, h, settings, out, now, latency)
+
+            if self.is_following:
+                self.engine.history.clear()
+            else:
+                motion, _ = self.engine.find_matching_motion(hands[gesture_idx[0]], self.cfg.motion_bank,
+                                                             settings.get("motion_threshold", 0.3))
+                plan = self.cfg.get_plan(motion, active_app) if motion else None
+                if plan:
+                    out.motion = motion
+                    self._fire(plan, motion, out)
+                    self.engine.history.clear()
+        else:
+            self.prev_x = None
+            self.engine.history.clear()
+
+        detected_name = out.gesture
+        if detected_name and not self.is_dragging:
+            if detected_name == self.curr_gest:
+                dur = now - self.gest_time
+                hold = settings["hold_time"]
+                out.progress = min(dur / hold, 1.0)
+                if dur >= hold and not self.triggered:
+                    plan = self.cfg.get_plan(detected_name, active_app)
+                    if plan: self._fire(plan, detected_name, out)
+                    self.triggered = True
+            else:
+                self.curr_gest = detected_name
+                self.gest_time = now
+                self.triggered = False
+        else:
+            self.curr_gest = None
+            self.triggered = False
+        return out
+
+    def _fire(self, plan, name, out):
+        if plan.source == "special:toggle_follow":
+            self.is_following = not self.is_following
+            self.prev_x = None
+            if not self.is_following:
+                self.is_dragging = False
+                self.mouse.mouse_up()
+        else:
+            self.executor.submit(plan, name)
+        out.fired = plan.source
+
+    def _combo(self, matches, labels, active_app):
+        if "Left" not in labels or "Right" not in labels: return None
+        left = matches[labels.index("Left")][0]
+        right = matches[labels.index("Right")][0]
+        if not left or not right: return None
+        combo = f"{left}{COMBO_SEP}{right}"
+        return combo if self.cfg.get_plan(combo, active_app) else None
+
+    def _track(self, lm, w, h, settings, out, now, latency):
+        raw_x, raw_y = lm.landmark[8].x, lm.landmark[8].y
+        self.cursor_filter.configure(settings)
+        if self.prev_x is None: self.cursor_filter.reset()
+        ix, iy = self.cursor_filter(raw_x, raw_y, now, latency)
+        if self.prev_x is None: self.prev_x, self.prev_y = ix, iy
+        sens = settings["trackpad_sensitivity"]
+        dx = (ix - self.prev_x) * w * sens
+        dy = (iy - self.prev_y) * h * sens
+        if abs(dx) > 1 or abs(dy) > 1:
+            self.mouse.move_rel(dx, dy)
+        self.prev_x, self.prev_y = ix, iy
+        dist = np.hypot(lm.landmark[4].x - lm.landmark[8].x, lm.landmark[4].y - lm.landmark[8].y)
+        out.cursor = (int(raw_x * w), int(raw_y * h))
+        out.pinch = dist < 0.04
+        if out.pinch:
+            if not self.is_dragging:
+                self.mouse.mouse_down()
+                self.is_dragging = True
+        elif self.is_dragging:
+            self.mouse.mouse_up()
+            self.is_dragging = False
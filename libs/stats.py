@@ -0,0 +1,111 @@
+import csv
+import json
+import time
+from collections import deque
+
+class _NullTimer:
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+NULL_TIMER = _NullTimer()
+
+class _StageTimer:
+    __slots__ = ("samples", "t0")
+
+    def __init__(self, samples):
+        self.samples = samples
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.samples.append(time.perf_counter() - self.t0)
+        return False
+
+def percentile(sorted_vals, q):
+    if not sorted_vals: return 0.0
+    i = min(len(sorted_vals) - 1, int(round(q / 100.0 * (len(sorted_vals) - 1))))
+    return sorted_vals[i]
+
+class PipelineStats:
+    def __init__(self, enabled=False, window=300):
+        self.enabled = enabled
+        self.window = window
+        self.stages = {}
+        self.timers = {}
+        self.frame_times = deque(maxlen=window)
+        self.latencies = deque(maxlen=window)
+        self.counters = {}
+        self.gauges = {}
+
+    def stage(self, name):
+        if not self.enabled: return NULL_TIMER
+        timer = self.timers.get(name)
+        if timer is None:
+            samples = self.stages[name] = deque(maxlen=self.window)
+            timer = self.timers[name] = _StageTimer(samples)
+        return timer
+
+    def add(self, name, seconds):
+        if not self.enabled: return
+        if name not in self.stages: self.stage(name)
+        self.stages[name].append(seconds)
+
+    def tick(self, ts=None):
+        if not self.enabled: return
+        self.frame_times.append(time.monotonic() if ts is None else ts)
+
+    def action_latency(self, capture_ts):
+        if not self.enabled: return
+        self.latencies.append(time.monotonic() - capture_ts)
+
+    def count(self, name, n=1):
+        if not self.enabled: return
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def gauge(self, name, value):
+        if not self.enabled: return
+        self.gauges[name] = value
+
+    def fps(self):
+        if len(self.frame_times) < 2: return 0.0
+        span = self.frame_times[-1] - self.frame_times[0]
+        return (len(self.frame_times) - 1) / span if span > 0 else 0.0
+
+    def _summary(self, samples):
+        vals = sorted(samples)
+        return {
+            "n": len(vals),
+            "p50_ms": percentile(vals, 50) * 1000,
+            "p95_ms": percentile(vals, 95) * 1000,
+            "p99_ms": percentile(vals, 99) * 1000,
+        }
+
+    def snapshot(self):
+        snap = {"fps": self.fps(), "stages": {k: self._summary(v) for k, v in self.stages.items()}}
+        if self.latencies: snap["action_latency"] = self._summary(self.latencies)
+        if self.counters: snap["counters"] = dict(self.counters)
+        if self.gauges: snap["gauges"] = dict(self.gauges)
+        return snap
+
+    def short_text(self):
+        if not self.enabled: return ""
+        frame = self._summary(self.stages.get("frame", ()))
+        return f"FPS {self.fps():.0f}  p95 {frame['p95_ms']:.1f}ms"
+
+    def export(self, path):
+        snap = self.snapshot()
+        if path.endswith(".csv"):
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                w = csv.writer(f)
+                w.writerow(["stage", "n", "p50_ms", "p95_ms", "p99_ms"])
+                rows = dict(snap["stages"])
+                if "action_latency" in snap: rows["action_latency"] = snap["action_latency"]
+                for name, s in rows.items():
+                    w.writerow([name, s["n"], f"{s['p50_ms']:.3f}", f"{s['p95_ms']:.3f}", f"{s['p99_ms']:.3f}"])
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(snap, f, indent=4)
+
+NULL_STATS = PipelineStats(enabled=False)
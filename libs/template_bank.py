@@ -0,0 +1,262 @@
+import numpy as np
+
+NUM_POINTS = 21
+POINT_DIM = 2
+FLAT_DIM = NUM_POINTS * POINT_DIM
+
+PROBE = [4, 8, 12, 16, 20]
+
+class TemplateBank:
+    def __init__(self, gestures=None, capacity=64, max_samples=32, ivf_min=4096, pca_dim=8):
+        self.max_samples = max_samples
+        self.ivf_min = ivf_min
+        self.pca_dim = pca_dim
+        self.names = []
+        self.index = {}
+        self.count = 0
+        self._data = np.zeros((capacity, NUM_POINTS, POINT_DIM), dtype=np.float32)
+        self._labels = np.zeros(capacity, dtype=np.int32)
+        self._diff = np.empty_like(self._data)
+        self._dist = np.empty((capacity, NUM_POINTS), dtype=np.float32)
+        self._probe = np.zeros((len(PROBE), POINT_DIM, capacity), dtype=np.float32)
+        self._pdiff = np.empty_like(self._probe)
+        self._pdist = np.empty((len(PROBE), capacity), dtype=np.float32)
+        self._batch = None
+        self._ivf = None
+        self._unindexed = []
+        self.cascade = True
+        self.cascade_min = 512
+        self.prune_queries = 0
+        self.prune_total = 0
+        self.prune_survivors = 0
+        if gestures:
+            self.rebuild(gestures)
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def templates(self):
+        return self._data[:self.count]
+
+    @property
+    def labels(self):
+        return self._labels[:self.count]
+
+    def _to_samples(self, landmarks):
+        if landmarks is None or (isinstance(landmarks, list) and not landmarks): return None
+        try:
+            arr = np.asarray(landmarks, dtype=np.float32)
+        except (TypeError, ValueError):
+            return None
+        if arr.shape == (NUM_POINTS, POINT_DIM): arr = arr[None]
+        if arr.ndim != 3 or arr.shape[1:] != (NUM_POINTS, POINT_DIM) or not len(arr): return None
+        return arr
+
+    def _reserve(self, n):
+        cap = self._data.shape[0]
+        if n <= cap: return
+        while cap < n: cap *= 2
+        data = np.zeros((cap, NUM_POINTS, POINT_DIM), dtype=np.float32)
+        labels = np.zeros(cap, dtype=np.int32)
+        data[:self.count] = self._data[:self.count]
+        labels[:self.count] = self._labels[:self.count]
+        self._data, self._labels = data, labels
+        probe = np.zeros((len(PROBE), POINT_DIM, cap), dtype=np.float32)
+        probe[..., :self.count] = self._probe[..., :self.count]
+        self._probe = probe
+        self._pdiff = np.empty_like(probe)
+        self._pdist = np.empty((len(PROBE), cap), dtype=np.float32)
+        self._diff = np.empty_like(data)
+        self._dist = np.empty((cap, NUM_POINTS), dtype=np.float32)
+        self._batch = None
+
+    def _append(self, label, samples):
+        n = len(samples)
+        self._reserve(self.count + n)
+        self._data[self.count:self.count + n] = samples
+        self._labels[self.count:self.count + n] = label
+        self._probe[..., self.count:self.count + n] = samples[:, PROBE].transpose(1, 2, 0)
+        if self._ivf is not None: self._unindexed.extend(range(self.count, self.count + n))
+        self.count += n
+
+    def _compact(self, keep):
+        n = int(keep.sum())
+        self._data[:n] = self._data[:self.count][keep]
+        self._labels[:n] = self._labels[:self.count][keep]
+        self._probe[..., :n] = self._probe[..., :self.count][..., keep]
+        self.count = n
+        self._ivf = None
+        self._unindexed = []
+
+    def rebuild(self, gestures):
+        self.names = []
+        self.index = {}
+        self.count = 0
+        self._ivf = None
+        self._unindexed = []
+        for name, data in gestures.items():
+            samples = self._to_samples(data)
+            if samples is None: continue
+            self.index[name] = len(self.names)
+            self.names.append(name)
+            self._append(self.index[name], samples[-self.max_samples:])
+
+    def samples(self, name):
+        label = self.index.get(name)
+        if label is None: return None
+        return self.templates[self.labels == label]
+
+    def add(self, name, landmarks):
+        samples = self._to_samples(landmarks)
+        if samples is None: return False
+        label = self.index.get(name)
+        if label is None:
+            label = self.index[name] = len(self.names)
+            self.names.append(name)
+        self._append(label, samples)
+        rows = np.flatnonzero(self.labels == label)
+        if len(rows) > self.max_samples:
+            keep = np.ones(self.count, dtype=bool)
+            keep[rows[:len(rows) - self.max_samples]] = False
+            self._compact(keep)
+        return True
+
+    def remove(self, name):
+        label = self.index.pop(name, None)
+        if label is None: return False
+        self._compact(self.labels != label)
+        self.names.pop(label)
+        self._labels[:self.count][self._labels[:self.count] > label] -= 1
+        self.index = {n: i for i, n in enumerate(self.names)}
+        return True
+
+    def distances(self, curr):
+        n = self.count
+        diff = self._diff[:n]
+        dist = self._dist[:n]
+        np.subtract(self._data[:n], curr, out=diff)
+        np.multiply(diff, diff, out=diff)
+        np.add(diff[..., 0], diff[..., 1], out=dist)
+        np.sqrt(dist, out=dist)
+        return dist.mean(axis=1)
+
+    def distances_many(self, currs):
+        k, n = len(currs), self.count
+        cap = self._data.shape[0]
+        if self._batch is None or self._batch[0].shape[0] < k:
+            self._batch = (np.empty((k, cap, NUM_POINTS, POINT_DIM), dtype=np.float32),
+                           np.empty((k, cap, NUM_POINTS), dtype=np.float32))
+        diff, dist = self._batch[0][:k, :n], self._batch[1][:k, :n]
+        np.subtract(self._data[None, :n], currs[:, None], out=diff)
+        np.multiply(diff, diff, out=diff)
+        np.add(diff[..., 0], diff[..., 1], out=dist)
+        np.sqrt(dist, out=dist)
+        return dist.mean(axis=2)
+
+    def _train(self):
+        x = self.templates.reshape(self.count, FLAT_DIM)
+        rng = np.random.default_rng(0)
+        sub = x[rng.choice(self.count, min(self.count, 2000), replace=False)]
+        mean = sub.mean(axis=0)
+        _, _, vt = np.linalg.svd(sub - mean, full_matrices=False)
+        proj = vt[:self.pca_dim].T.astype(np.float32)
+        emb = (x - mean) @ proj
+
+        nlist = max(4, int(np.sqrt(self.count)))
+        cents = emb[rng.choice(self.count, nlist, replace=False)].copy()
+        for _ in range(8):
+            assign = self._nearest(emb, cents)
+            for c in range(nlist):
+                members = emb[assign == c]
+                if len(members): cents[c] = members.mean(axis=0)
+        assign = self._nearest(emb, cents)
+        order = np.argsort(assign, kind="stable").astype(np.int32)
+        bounds = np.searchsorted(assign[order], np.arange(nlist + 1))
+        self._ivf = (mean, proj, cents, order, bounds)
+        self._unindexed = []
+
+    def _nearest(self, emb, cents):
+        d = (emb * emb).sum(axis=1)[:, None] - 2 * emb @ cents.T + (cents * cents).sum(axis=1)[None]
+        return np.argmin(d, axis=1)
+
+    def candidates(self, curr, nprobe=None):
+        if self.count < self.ivf_min: return None
+        if self._ivf is None or len(self._unindexed) > self.count // 10: self._train()
+        mean, proj, cents, order, bounds = self._ivf
+        e = (curr.reshape(FLAT_DIM) - mean) @ proj
+        nprobe = nprobe or max(4, int(round(len(cents) ** 0.5)))
+        probe = np.argpartition(((cents - e) ** 2).sum(axis=1), min(nprobe, len(cents)) - 1)[:nprobe]
+        rows = [order[bounds[c]:bounds[c + 1]] for c in probe]
+        if self._unindexed: rows.append(np.array(self._unindexed, dtype=np.int32))
+        return np.concatenate(rows)
+
+    def lower_bounds(self, curr, rows=None):
+        n = self.count if rows is None else len(rows)
+        diff, dist = self._pdiff[..., :n], self._pdist[:, :n]
+        probe = self._probe[..., :n] if rows is None else self._probe[..., rows]
+        np.subtract(probe, curr[PROBE, :, None], out=diff)
+        np.multiply(diff, diff, out=diff)
+        np.add(diff[:, 0], diff[:, 1], out=dist)
+        np.sqrt(dist, out=dist)
+        return dist.sum(axis=0) / NUM_POINTS
+
+    def pruning_ratio(self):
+        if not self.prune_total: return 0.0
+        return 1.0 - self.prune_survivors / self.prune_total
+
+    def knn(self, curr, k=5, bound=None):
+        curr = np.asarray(curr, dtype=np.float32)
+        rows = self.candidates(curr)
+        if self.cascade and bound is not None and self.count >= self.cascade_min:
+            mask = self.lower_bounds(curr, rows) < bound + 1e-6
+            considered = self.count if rows is None else len(rows)
+            rows = np.flatnonzero(mask) if rows is None else rows[mask]
+            self.prune_queries += 1
+            self.prune_total += considered
+            self.prune_survivors += len(rows)
+            if not len(rows): return rows, np.empty(0, dtype=np.float32)
+        if rows is None or not len(rows):
+            dists = self.distances(curr)
+            rows = np.arange(self.count)
+        else:
+            diff = self._data[rows] - curr
+            dists = np.sqrt((diff * diff).sum(axis=2)).mean(axis=1)
+        top = self._top(dists, k)
+        return rows[top], dists[top]
+
+    def _top(self, dists, k):
+        k = min(k, len(dists))
+        top = np.argpartition(dists, k - 1)[:k]
+        return top[np.argsort(dists[top])]
+
+    def classify(self, curr, k=5, threshold=0.1, thresholds=None):
+        if not self.count: return None, float('inf')
+        bound = max(threshold, max(thresholds.values())) if thresholds else threshold
+        rows, dists = self.knn(curr, k, bound)
+        if not len(rows): return None, float('inf')
+        return self._vote(rows, dists, threshold, thresholds)
+
+    def classify_many(self, currs, k=5, threshold=0.1, thresholds=None):
+        currs = np.asarray(currs, dtype=np.float32).reshape(-1, NUM_POINTS, POINT_DIM)
+        if not self.count: return [(None, float('inf'))] * len(currs)
+        if (self.cascade and self.count >= self.cascade_min) or self.count >= self.ivf_min:
+            return [self.classify(c, k, threshold, thresholds) for c in currs]
+        dists = self.distances_many(currs)
+        out = []
+        for d in dists:
+            top = self._top(d, k)
+            out.append(self._vote(top, d[top], threshold, thresholds))
+        return out
+
+    def _vote(self, rows, dists, threshold, thresholds):
+        votes = {}
+        for row, d in zip(rows, dists):
+            name = self.names[self._labels[row]]
+            limit = thresholds.get(name, threshold) if thresholds else threshold
+            if d < limit:
+                n, best = votes.get(name, (0, d))
+                votes[name] = (n + 1, min(best, d))
+        if not votes: return None, float(dists[0])
+        name = min(votes, key=lambda g: (-votes[g][0], votes[g][1]))
+        return name, float(votes[name][1])
@@ -0,0 +1,80 @@
+import threading
+
+try:
+    import pygetwindow as gw
+except (ImportError, NotImplementedError):
+    gw = None
+
+class PyGetWindowBackend:
+    def active_title(self):
+        w = gw.getActiveWindow()
+        return w.title if w and w.title else None
+
+class FakeWindowBackend:
+    def __init__(self, title=None):
+        self.title = title
+        self.changed = threading.Event()
+
+    def set_title(self, title):
+        self.title = title
+        self.changed.set()
+
+    def active_title(self):
+        return self.title
+
+    def wake(self):
+        self.changed.set()
+
+    def wait_change(self, timeout):
+        fired = self.changed.wait(timeout)
+        self.changed.clear()
+        return fired
+
+def default_backend():
+    return PyGetWindowBackend() if gw else None
+
+class WindowFocus:
+    def __init__(self, backend=None, rate=10.0, default="GLOBAL"):
+        self.backend = backend if backend is not None else default_backend()
+        self.interval = 1.0 / rate if rate > 0 else 0.1
+        self.default = default
+        self.title = default
+        self.listeners = []
+        self.running = False
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.backend is None or self.running: return self
+        self.refresh()
+        self.running = True
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self._loop, name="WindowFocus", daemon=True)
+        self.thread.start()
+        return self
+
+    def refresh(self):
+        try:
+            title = self.backend.active_title() or self.default
+        except Exception:
+            return self.title
+        if title != self.title:
+            self.title = title
+            for cb in self.listeners:
+                try: cb(title)
+                except Exception as e: print(f"[Focus] Ошибка обработчика: {e}")
+        return title
+
+    def _loop(self):
+        wait_change = getattr(self.backend, "wait_change", None)
+        while self.running:
+            if wait_change: wait_change(self.interval)
+            else: self.stopped.wait(self.interval)
+            if self.running: self.refresh()
+
+    def stop(self):
+        self.running = False
+        self.stopped.set()
+        wake = getattr(self.backend, "wake", None)
+        if wake: wake()
+        if self.thread: self.thread.join(timeout=1.0)
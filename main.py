@@ -1,17 +1,48 @@
+import sys
+
+def arg_value(name):
+    if name in sys.argv:
+        i = sys.argv.index(name)
+        if i + 1 < len(sys.argv): return sys.argv[i + 1]
+    return None
+
+if __name__ == "__main__" and arg_value("--replay"):
+    from libs.replay import run_replay, compare_flow
+    if "--flow-compare" in sys.argv: compare_flow(arg_value("--replay"))
+    else: run_replay(arg_value("--replay"), arg_value("--trace"), arg_value("--timings"), float(arg_value("--latency") or 0))
+    sys.exit(0)
+
+if __name__ == "__main__" and "--daemon" in sys.argv:
+    from libs.daemon import run_daemon
+    source = arg_value("--source") or "0"
+    run_daemon(arg_value("--socket"), source, arg_value("--stats-out"))
+    sys.exit(0)
+
 import cv2
 import time
-import numpy as np
-import pyautogui
 import tkinter as tk
 from tkinter import ttk
-from libs.gesture_engine import GestureEngine
 from libs.config_manager import ConfigManager
-from libs.action_handler import ActionHandler
+from libs.action_handler import ActionHandler, ActionExecutor
+from libs.action_plan import ActionError
+from libs.input_backend import make_backend, CursorMotion
+from libs.capture import FrameGrabber, open_source, describe_source
+from libs.window_focus import WindowFocus
+from libs.session import GestureSession, COMBO_SEP
+from libs.recording import LandmarkRecorder
+from libs.stats import PipelineStats, percentile
+from libs.idle import IdleGate
+from libs.pipeline import FramePipeline, build_engine
+from libs.preview import PreviewRenderer, draw_ui_text
+from libs.events import EventBus, UiDispatcher
 import platform
 import keyboard
-import sys
 
 NO_PREVIEW = "--no-preview" in sys.argv
+RECORD_PATH = arg_value("--record")
+STATS_ENABLED = "--stats" in sys.argv or arg_value("--stats-out") is not None
+STATS_PATH = arg_value("--stats-out")
+SOURCE = arg_value("--source") or "0"
 
 BG_COLOR = "#1e1e1e"
 FG_COLOR = "#ffffff"
@@ -23,7 +54,7 @@ HINT_COLOR = "#aaaaaa"
 
 try:
     import pygetwindow as gw
-except ImportError:
+except (ImportError, NotImplementedError):
     gw = None
 
 def hex_to_bgr(hex_color):
@@ -34,17 +65,6 @@ def hex_to_bgr(hex_color):
 CV_ACCENT = hex_to_bgr(ACCENT_COLOR)
 CV_WHITE = (255, 255, 255)
 
-def draw_ui_text(img, text, pos):
-    x, y = pos
-    font = cv2.FONT_HERSHEY_SIMPLEX
-    scale = 0.7
-    thickness = 1
-    pad = 10
-    (w, h), baseline = cv2.getTextSize(text, font, scale, thickness)
-    cv2.rectangle(img, (x - pad, y - h - pad), (x + w + pad, y + pad), (0, 0, 0), -1)
-    cv2.rectangle(img, (x - pad, y - h - pad), (x + w + pad, y + pad), CV_ACCENT, 1)
-    cv2.putText(img, text, (x, y), font, scale, CV_ACCENT, thickness, cv2.LINE_AA)
-
 class ModernUI(tk.Toplevel):
     def __init__(self, parent, title, w=500, h=400):
         super().__init__(parent)
@@ -102,7 +122,7 @@ class InputDialog(ModernUI):
         self.entry.focus_set()
         self.entry.bind("<Return>", lambda e: self.on_ok())
         
-        tk.Label(self, text="Пример: volume_up, open_chrome, peace_sign", 
+        tk.Label(self, text="Пример: volume_up, open_chrome, fist&peace (левая&правая)", 
                  bg=BG_COLOR, fg="gray", font=("Arial", 8)).pack(pady=0)
         
         btn_frame = tk.Frame(self, bg=BG_COLOR)
@@ -261,7 +281,7 @@ class AppController:
             except: pass
         return sorted(list(set(titles)))
 
-    def save_sequence(self, current_app, landmarks):
+    def save_sequence(self, current_app, landmarks, motion=None):
         self.ui_blocked = True
         self.root.update()
         
@@ -271,9 +291,16 @@ class AppController:
             return
 
         name = inp.result
+        if COMBO_SEP in name:
+            landmarks = None
 
-        prof_win = ModernUI(self.root, "Выбор профиля", 400, 200)
+        prof_win = ModernUI(self.root, "Выбор профиля", 400, 200 if motion is None else 260)
         tk.Label(prof_win, text=f"Где должен работать жест '{name}'?", bg=BG_COLOR, fg="white", font=("Arial", 10)).pack(pady=10)
+
+        kind_var = tk.StringVar(value="Поза")
+        if motion is not None:
+            ttk.Combobox(prof_win, textvariable=kind_var, values=["Поза", "Движение (последняя секунда)"],
+                         state="readonly").pack(fill=tk.X, padx=30, pady=5)
         
         c_var = tk.StringVar(value="GLOBAL")
         vals = self.get_windows()
@@ -289,19 +316,22 @@ class AppController:
         
         self.root.wait_window(prof_win)
         target_prof = c_var.get()
+        if kind_var.get() == "Поза": motion = None
 
         ed = MacroEditor(self.root)
         self.root.wait_window(ed)
         
         if ed.result:
-            self.cfg.save_gesture(name, landmarks, ed.result, target_prof)
-            print(f"[SUCCESS] Жест '{name}' сохранен для {target_prof}")
+            try:
+                self.cfg.save_gesture(name, landmarks, ed.result, target_prof, motion)
+                print(f"[SUCCESS] Жест '{name}' сохранен для {target_prof}")
+            except ActionError as e:
+                print(f"!!! Действие не сохранено: {e}")
         
         self.ui_blocked = False
 
     def open_manager(self):
         self.ui_blocked = True
-        time.sleep(0.1)
         win = ModernUI(self.root, "Менеджер Жестов", 600, 450)
         
         nb = ttk.Notebook(win)
@@ -342,6 +372,8 @@ class AppController:
                     self.cfg.save_gesture(gname, None, ed.result, prof)
                     lb.delete(sel[0])
                     lb.insert(sel[0], f"{gname}  ->  {ed.result}")
+            except ActionError as e:
+                print(f"!!! Действие не сохранено: {e}")
             except: pass
 
         def delete():
@@ -368,8 +400,7 @@ class AppController:
 
     def open_settings(self):
         self.ui_blocked = True
-        time.sleep(0.1)
-        win = ModernUI(self.root, "Настройки", 350, 250)
+        win = ModernUI(self.root, "Настройки", 350, 430)
         
         def mk_scale(txt, key, min_v, max_v):
             tk.Label(win, text=txt, bg=BG_COLOR, fg="gray").pack(pady=(10,0))
@@ -381,10 +412,16 @@ class AppController:
             return s
             
         s_sens = mk_scale("Чувствительность мыши (Speed)", "trackpad_sensitivity", 1, 10)
+        s_cutoff = mk_scale("Сглаживание курсора (меньше = плавнее)", "cursor_min_cutoff", 0.1, 5)
+        s_beta = mk_scale("Отзывчивость курсора на скорости", "cursor_beta", 0, 50)
+        s_pred = mk_scale("Упреждение задержки (доля)", "cursor_prediction", 0, 1.5)
         s_hold = mk_scale("Время удержания жеста (сек)", "hold_time", 0.1, 2.0)
         
         def save():
             self.cfg.save_setting("trackpad_sensitivity", s_sens.get())
+            self.cfg.save_setting("cursor_min_cutoff", s_cutoff.get())
+            self.cfg.save_setting("cursor_beta", s_beta.get())
+            self.cfg.save_setting("cursor_prediction", s_pred.get())
             self.cfg.save_setting("hold_time", s_hold.get())
             win.destroy()
             
@@ -394,7 +431,11 @@ class AppController:
         self.ui_blocked = False
 
 class HudOverlay:
-    def __init__(self):
+    def __init__(self, show_stats=False, min_interval=0.2):
+        self.min_interval = min_interval
+        self.key = None
+        self.stats_txt = ""
+        self.last = 0.0
         self.win = tk.Toplevel()
         self.win.overrideredirect(True)
         self.win.wm_attributes("-topmost", True)
@@ -409,177 +450,175 @@ class HudOverlay:
         self.label.pack(padx=10, pady=5, anchor="w")
         
         h = self.win.winfo_screenheight()
-        self.win.geometry(f"250x60+20+{h-150}")
+        self.win.geometry(f"250x{80 if show_stats else 60}+20+{h-150}")
 
-    def update(self, mode, gesture, app_title):
+    def update(self, mode, gesture, app_title, stats_txt=""):
+        key = (mode, gesture, app_title)
+        now = time.monotonic()
+        if key == self.key and (stats_txt == self.stats_txt or now - self.last < self.min_interval): return
+        self.key, self.stats_txt, self.last = key, stats_txt, now
         app_short = (app_title[:18] + '..') if len(app_title) > 18 else app_title
         txt = f"[{mode}]\nGesture: {gesture or '--'}\nScope: {app_short}"
+        if stats_txt: txt += f"\n{stats_txt}"
         self.label.config(text=txt)
-        self.win.update()
 
-def is_cam_window_active():
-    if gw:
-        try:
-            w = gw.getActiveWindow()
-            if w and "GestureCam" in w.title: return True
-        except: pass
-    return True 
+def is_cam_window_active(focus):
+    if focus.backend is None: return True
+    return "GestureCam" in focus.title
 
 def main():
     app = AppController()
-    engine = GestureEngine()
-    actor = ActionHandler()
-    hud = HudOverlay()
-    
-    cap = cv2.VideoCapture(0)
-    if not NO_PREVIEW:
-        cv2.namedWindow("GestureCam", cv2.WINDOW_NORMAL)
-        cv2.resizeWindow("GestureCam", 640, 480)
-
-    is_following = False
-    is_dragging = False
-    prev_x, prev_y = None, None
-    curr_gest = None
-    gest_time = 0
-    triggered = False
-    btn_cooldown = 0
+    settings = app.cfg.config["settings"]
+    engine = build_engine(settings)
+    worker = engine.worker
+    stats = PipelineStats(enabled=STATS_ENABLED)
+    engine.stats = stats
+    input_backend = make_backend(settings.get("input_backend", "auto"))
+    cursor = CursorMotion(input_backend, settings.get("cursor_rate", 240)).start()
+    actor = ActionHandler(input_backend)
+    executor = ActionExecutor(actor).start()
+    hud = HudOverlay(show_stats=STATS_ENABLED)
+    focus = WindowFocus(rate=settings.get("focus_poll_rate", 10)).start()
     
-    pending_save_landmarks = None
-    pending_save_frame = None
-
-    print("--- SYSTEM READY ---")
-
-    while True:
-        if pending_save_landmarks and pending_save_frame is not None:
-            paused_view = pending_save_frame.copy()
-            draw_ui_text(paused_view, "FROZEN: SAVING...", (20, 50))
-            cv2.imshow("GestureCam", paused_view)
-            cv2.waitKey(1) 
-            
-            while keyboard.is_pressed('s'):
-                app.root.update()
-                time.sleep(0.01)
-
-            app.root.update()
-            app.save_sequence("GLOBAL", pending_save_landmarks)
-            
-            pending_save_landmarks = None
-            pending_save_frame = None
-            continue
-
+    source = open_source(SOURCE, settings)
+    print(f"[Capture] {describe_source(source.describe())}")
+    grabber = FrameGrabber(source).start()
+    preview = None if NO_PREVIEW else PreviewRenderer(engine, CV_ACCENT, fps=settings.get("preview_fps", 30), stats=stats).start()
+    ui_interval = 1.0 / max(settings.get("ui_rate", 30), 1)
+
+    session = GestureSession(engine, app.cfg, executor, cursor)
+    idle = IdleGate.from_settings(settings)
+    recorder = LandmarkRecorder(RECORD_PATH) if RECORD_PATH else None
+    pipeline = FramePipeline(engine, session, idle, grabber, stats, recorder)
+    bus = EventBus()
+    ui = UiDispatcher(app.root)
+    state = {"hands": None, "frame": None, "cooldown": 0.0, "last_ui": 0.0, "blocked": False}
+
+    def update_hud(*args):
+        with stats.stage("hud.update"):
+            hud.update(*args)
+
+    def on_frame(_):
+        with stats.stage("capture_wait"):
+            captured = grabber.read(timeout=0)
+        if captured is None:
+            if not grabber.running: bus.stop()
+            return
         if app.ui_blocked:
-            hud.update("MENU OPEN", None, "System")
-            app.root.update()
-            time.sleep(0.05)
-            continue
+            if not state["blocked"]: ui.post(hud.update, "MENU OPEN", None, "System")
+            state["blocked"] = True
+            return
+        state["blocked"] = False
+        frame_t0 = time.perf_counter()
+        active_app_title = focus.title
+        frame, hands, _, out, _, _ = pipeline.process(captured, active_app_title)
+        state["hands"], state["frame"] = hands, frame
+
+        mode_txt = "IDLE" if idle.idle else "MOUSE: ON" if session.is_following else "GESTURE"
+        stats_txt = stats.short_text()
+        if preview: preview.submit(frame, hands, out, stats_txt)
+        now = time.monotonic()
+        if now - state["last_ui"] >= ui_interval:
+            state["last_ui"] = now
+            ui.post(update_hud, mode_txt, session.curr_gest, active_app_title, stats_txt)
+        stats.add("frame", time.perf_counter() - frame_t0)
+
+    def on_action(_):
+        for status, tag, act, err in executor.poll_events():
+            if status == "error": print(f"!!! Error [{tag}]: {err}")
+            elif status == "dropped": print(f"!!! Очередь действий заполнена, '{tag}' пропущен")
+
+    def on_key(key):
+        if NO_PREVIEW or app.ui_blocked or not is_cam_window_active(focus) or time.time() - state["cooldown"] < 0.5: return
+        state["cooldown"] = time.time()
+        if key == 'q':
+            bus.stop()
+        elif key == 'l':
+            ui.post(app.open_manager)
+        elif key == 'o':
+            ui.post(app.open_settings)
+        elif key == 's':
+            hands = state["hands"]
+            if not hands:
+                print("!!! НЕТ РУКИ В КАДРЕ !!!")
+                return
+            app.ui_blocked = True
+            landmarks = engine.normalize_landmarks(hands[0].landmark).tolist()
+            motion = engine.history.trajectory()
+            if preview:
+                paused_view = state["frame"].copy()
+                for lm in hands:
+                    engine.mp_draw.draw_landmarks(paused_view, lm, engine.mp_hands.HAND_CONNECTIONS, landmark_drawing_spec=engine.draw_spec)
+                draw_ui_text(paused_view, "FROZEN: SAVING...", (20, 50), CV_ACCENT)
+                preview.show(paused_view)
+            ui.post(app.save_sequence, "GLOBAL", landmarks, motion)
+
+    def present():
+        preview.present()
+        app.root.after(max(int(preview.interval * 1000), 1), present)
+
+    def start():
+        if preview: present()
+        bus.start()
+        bus.every(settings.get("config_poll_interval", 1.0), "config")
+        if not NO_PREVIEW:
+            for key in "qlos":
+                keyboard.add_hotkey(key, bus.post, args=("key", key), trigger_on_release=(key == 's'))
 
-        success, frame = cap.read()
-        if not success: break
-        frame = cv2.flip(frame, 1)
-        h, w, _ = frame.shape
-        
-        results = engine.process_frame(frame)
-        
-        active_app_title = "GLOBAL"
-        if gw:
-            try:
-                w_obj = gw.getActiveWindow()
-                if w_obj and w_obj.title: active_app_title = w_obj.title
-            except: pass
+    bus.on("frame", on_frame).on("action", on_action).on("key", on_key)
+    bus.on("config", lambda _: app.cfg.check_reload())
+    bus.on("stop", lambda _: ui.post(app.root.quit))
+    grabber.on_frame = lambda: bus.post("frame")
+    executor.on_event = lambda event: bus.post("action")
 
-        detected_name = None
-        
-        if results.multi_hand_landmarks:
-            lm = results.multi_hand_landmarks[0]
-            engine.mp_draw.draw_landmarks(frame, lm, engine.mp_hands.HAND_CONNECTIONS, landmark_drawing_spec=engine.draw_spec)
-            
-            detected_name, _ = engine.find_matching_gesture(lm, app.cfg.get_gestures())
-            
-            if is_following:
-                ix, iy = lm.landmark[8].x, lm.landmark[8].y
-                if prev_x is None: prev_x, prev_y = ix, iy
-                sens = app.cfg.config["settings"]["trackpad_sensitivity"]
-                dx = (ix - prev_x) * w * sens
-                dy = (iy - prev_y) * h * sens
-                if abs(dx) > 1 or abs(dy) > 1:
-                    pyautogui.moveRel(dx, dy)
-                prev_x, prev_y = ix, iy
-                dist = np.hypot(lm.landmark[4].x - lm.landmark[8].x, lm.landmark[4].y - lm.landmark[8].y)
-                cx, cy = int(lm.landmark[8].x * w), int(lm.landmark[8].y * h)
-                if dist < 0.04:
-                    cv2.circle(frame, (cx, cy), 15, (0, 0, 255), -1)
-                    if not is_dragging:
-                        pyautogui.mouseDown()
-                        is_dragging = True
-                else:
-                    cv2.circle(frame, (cx, cy), 10, (0, 255, 255), -1)
-                    if is_dragging:
-                        pyautogui.mouseUp()
-                        is_dragging = False
-        else:
-            prev_x = None
-
-        if detected_name and not is_dragging:
-            if detected_name == curr_gest:
-                dur = time.time() - gest_time
-                hold = app.cfg.config["settings"]["hold_time"]
-                progress_ratio = min(dur / hold, 1.0)
-                bw = int(progress_ratio * 200)
-                if not NO_PREVIEW:
-                    cv2.rectangle(frame, (20, h-40), (220, h-30), (50, 50, 50), -1)
-                    cv2.rectangle(frame, (20, h-40), (20+bw, h-30), (0, 255, 0), -1)
-                if dur >= hold and not triggered:
-                    act = app.cfg.get_action(detected_name, active_app_title)
-                    if act == "special:toggle_follow":
-                        is_following = not is_following
-                        prev_x = None
-                        if not is_following: 
-                            is_dragging = False
-                            pyautogui.mouseUp()
-                    elif act:
-                        actor.execute(act)
-                        cv2.rectangle(frame, (0,0), (w,h), (0,255,0), 10)
-                    triggered = True
-            else:
-                curr_gest = detected_name
-                gest_time = time.time()
-                triggered = False
-        else:
-            curr_gest = None
-            triggered = False
-
-        if is_cam_window_active() and time.time() - btn_cooldown > 0.5:
-            if not NO_PREVIEW and is_cam_window_active() and time.time() - btn_cooldown > 0.5:
-                if keyboard.is_pressed('q'):
-                    break
-                elif keyboard.is_pressed('l'):
-                    btn_cooldown = time.time()
-                    app.open_manager()
-                elif keyboard.is_pressed('o'):
-                    btn_cooldown = time.time()
-                    app.open_settings()
-                elif keyboard.is_pressed('s'):
-                    btn_cooldown = time.time()
-                    if results.multi_hand_landmarks:
-                        pending_save_landmarks = engine.normalize_landmarks(results.multi_hand_landmarks[0].landmark)
-                        pending_save_frame = frame.copy()
-                    else:
-                        print("!!! НЕТ РУКИ В КАДРЕ !!!")
-
-        mode_txt = "MOUSE: ON" if is_following else "GESTURE"
-        hud.update(mode_txt, curr_gest, active_app_title)
-        if not NO_PREVIEW:
-            if results.multi_hand_landmarks:
-                lm = results.multi_hand_landmarks[0]
-                engine.mp_draw.draw_landmarks(frame, lm, engine.mp_hands.HAND_CONNECTIONS, landmark_drawing_spec=engine.draw_spec)
-            draw_ui_text(frame, "KEYS: S(Save) L(List) O(Opts) Q(Quit)", (10, 30))
-            cv2.imshow("GestureCam", frame)
-        try:
-            app.root.update()
-        except: pass
-        cv2.waitKey(1)
-
-    cap.release()
+    print("--- SYSTEM READY ---")
+    app.root.after(0, start)
+    app.root.mainloop()
+    bus.stop()
+    bus.join(2.0)
+    if not NO_PREVIEW: keyboard.unhook_all_hotkeys()
+
+    if recorder:
+        recorder.close()
+        print(f"[Record] Записано кадров: {recorder.frames} -> {RECORD_PATH}")
+    app.cfg.close()
+    focus.stop()
+    executor.stop()
+    cursor.stop()
+    grabber.stop()
+    if worker:
+        worker.stop()
+        print(f"[Worker] Отправлено: {worker.submitted}, готово: {worker.completed}, "
+              f"пропущено: {worker.dropped}, опоздало: {worker.late}")
+    print(f"[Capture] Кадров: {grabber.seq}, пропущено: {grabber.dropped}, "
+          f"фактически {source.fps():.1f} fps (заявлено {source.negotiated.get('fps') or 0:.1f})")
+    if engine.flow:
+        f = engine.flow
+        print(f"[Flow] Вызовов модели: {f.keyframes}, по оптическому потоку: {f.tracked}, "
+              f"сбросов: {f.rejected} ({f.model_call_ratio():.0%} кадров через модель)")
+    if idle.wakeups or idle.idle:
+        lat = sorted(idle.wake_latencies)
+        p95 = percentile(lat, 95)
+        print(f"[Idle] CPU в простое: {idle.cpu_percent():.1f}%, пробуждений: {idle.wakeups}, "
+              f"задержка p95: {p95 * 1000:.0f}ms (цель {settings.get('wake_latency_target', 0.3) * 1000:.0f}ms)")
+    bank = app.cfg.bank
+    if bank.prune_queries:
+        print(f"[Match] Каскад отсеял {bank.pruning_ratio():.1%} кандидатов ({bank.prune_queries} запросов)")
+    if STATS_PATH:
+        stats.count("captured", grabber.seq)
+        stats.count("dropped", grabber.dropped)
+        stats.gauge("cascade_pruning_ratio", bank.pruning_ratio())
+        stats.gauge("idle_cpu_percent", idle.cpu_percent())
+        if engine.flow: stats.gauge("flow_model_call_ratio", engine.flow.model_call_ratio())
+        if worker:
+            stats.count("worker_dropped", worker.dropped)
+            stats.count("worker_late", worker.late)
+        stats.gauge("idle_wakeups", idle.wakeups)
+        for lat in idle.wake_latencies: stats.add("idle.wake_latency", lat)
+        stats.gauge("cascade_survivors_per_query", bank.prune_survivors / max(bank.prune_queries, 1))
+        stats.export(STATS_PATH)
+        print(f"[Stats] Сохранено в {STATS_PATH}")
+    if preview: preview.stop()
     cv2.destroyAllWindows()
     hud.win.destroy()
     app.root.destroy()
@@ -0,0 +1,74 @@
+import threading
+
+from libs.action_handler import ActionExecutor
+
+class GatedHandler:
+    def __init__(self):
+        self.ran = []
+        self.started = threading.Event()
+        self.gate = threading.Event()
+
+    def run_op(self, op, cancel=None):
+        self.ran.append(op.source)
+        self.started.set()
+        if op.source == "wait:5": cancel.wait(5)
+        elif op.source == "hotkey:ctrl+b": self.gate.wait(5)
+
+def events_until(executor, count):
+    done = threading.Semaphore(0)
+    executor.on_event = lambda event: done.release()
+    return lambda: all(done.acquire(timeout=2) for _ in range(count))
+
+def test_jobs_run_in_order():
+    handler = GatedHandler()
+    executor = ActionExecutor(handler)
+    wait = events_until(executor, 3)
+    for key in "abc": executor.submit(f"hotkey:ctrl+{key}", key, replace=False)
+    handler.gate.set()
+    executor.start()
+    assert wait()
+    assert handler.ran == ["hotkey:ctrl+a", "hotkey:ctrl+b", "hotkey:ctrl+c"]
+    assert [e[0] for e in executor.poll_events()] == ["done"] * 3
+    executor.stop()
+
+def test_replace_cancels_running_and_queued():
+    handler = GatedHandler()
+    executor = ActionExecutor(handler).start()
+    executor.submit("wait:5", "slow")
+    assert handler.started.wait(2)
+    executor.submit("hotkey:ctrl+q", "queued", replace=False)
+    wait = events_until(executor, 3)
+    executor.submit("hotkey:ctrl+r", "new")
+    assert wait()
+    events = {tag: status for status, tag, _, _ in executor.poll_events()}
+    assert events == {"slow": "cancelled", "queued": "cancelled", "new": "done"}
+    assert "hotkey:ctrl+q" not in handler.ran
+    executor.stop()
+
+def test_cancel_between_dequeue_and_start_skips_job():
+    handler = GatedHandler()
+    executor = ActionExecutor(handler)
+    executor.submit("hotkey:ctrl+x", "late", replace=False)
+    job = executor.jobs.get_nowait()
+    executor.cancel()
+    executor.jobs.put_nowait(job)
+    wait = events_until(executor, 1)
+    executor.start()
+    assert wait()
+    assert executor.poll_events() == [("cancelled", "late", "hotkey:ctrl+x", None)]
+    assert handler.ran == []
+    executor.stop()
+
+def test_errors_and_bad_actions_are_reported():
+    class Failing:
+        def run_op(self, op, cancel=None): raise OSError("no display")
+    executor = ActionExecutor(Failing())
+    assert not executor.submit("nonsense:1", "bad")
+    wait = events_until(executor, 1)
+    executor.start()
+    executor.submit("hotkey:ctrl+c", "fail")
+    assert wait()
+    events = executor.poll_events()
+    assert events[0][:2] == ("error", "bad")
+    assert events[1] == ("error", "fail", "hotkey:ctrl+c", "hotkey:ctrl+c: no display")
+    executor.stop()
@@ -0,0 +1,50 @@
+import types
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from libs.gesture_engine import GestureEngine
+from libs.recording import Point, Hand
+from libs.template_bank import TemplateBank
+
+FRAMES = 300
+PEAK_LIMIT = 64 * 1024
+GROWTH_LIMIT = 4 * 1024
+
+def per_frame(fn, frames=FRAMES):
+    for _ in range(20): fn()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for _ in range(frames): fn()
+        warm = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        for _ in range(frames): fn()
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - before, after - warm
+
+def cases():
+    rng = np.random.default_rng(5)
+    engine = GestureEngine(load_model=False, max_hands=2)
+    hand = Hand([Point(float(x), float(y), 0.0) for x, y in rng.uniform(0.3, 0.7, (21, 2))])
+    bank = TemplateBank({f"g{i}": rng.random((1, 21, 2)).astype(np.float32) for i in range(100)})
+    frame = rng.integers(0, 255, (480, 640, 3), dtype=np.uint8)
+    engine.hands = types.SimpleNamespace(process=lambda img: types.SimpleNamespace(multi_hand_landmarks=None))
+    roi = GestureEngine(load_model=False, roi_mode=True)
+    roi.hands = engine.hands
+    return {
+        "normalize_landmarks": lambda: engine.normalize_landmarks(hand.landmark),
+        "find_matching_gesture": lambda: engine.find_matching_gesture(hand, bank, 0.07),
+        "find_matching_gestures": lambda: engine.find_matching_gestures([hand, hand], bank, 0.07),
+        "infer.full_frame": lambda: engine._infer(frame),
+        "infer.roi": lambda: roi._infer(frame),
+    }
+
+@pytest.mark.parametrize("name", list(cases()))
+def test_per_frame_allocations_are_bounded(name):
+    peak, growth = per_frame(cases()[name])
+    assert peak <= PEAK_LIMIT, f"{name}: peak {peak} bytes"
+    assert growth <= GROWTH_LIMIT, f"{name}: grew {growth} bytes"
@@ -0,0 +1,156 @@
+import json
+import os
+import stat
+import threading
+
+import numpy as np
+import pytest
+
+import libs.config_manager as config_manager
+from libs.config_manager import ConfigManager, CONFIG_FILE, GESTURES_FILE
+
+def sample(seed):
+    return np.random.default_rng(seed).random((21, 2)).astype(np.float32)
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config_manager, "SAVE_DEBOUNCE", 0.0)
+    return tmp_path
+
+def write_config(data):
+    with open(CONFIG_FILE, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+def read_config():
+    with open(CONFIG_FILE, encoding="utf-8") as f:
+        return json.load(f)
+
+def base_config(**extra):
+    data = {"profiles": {"GLOBAL": {"actions": {"fist": "hotkey:ctrl+c"}}},
+            "settings": dict(config_manager.DEFAULT_CONFIG["settings"])}
+    data.update(extra)
+    return data
+
+def test_legacy_gestures_merge_into_sidecar(workdir):
+    write_config(base_config())
+    cfg = ConfigManager()
+    cfg.save_gesture("fist", [sample(1)])
+    cfg.close()
+
+    data = read_config()
+    data["gestures"] = {"palm": [sample(2).tolist()], "fist": [sample(3).tolist()]}
+    write_config(data)
+    cfg = ConfigManager()
+    cfg.close()
+    assert "gestures" not in read_config()
+
+    cfg = ConfigManager()
+    assert sorted(cfg.config["gestures"]) == ["fist", "palm"]
+    assert len(cfg.config["gestures"]["fist"]) == 2
+    assert np.allclose(cfg.config["gestures"]["palm"][0], sample(2))
+    cfg.close()
+
+def test_rewrite_keeps_file_mode(workdir):
+    write_config(base_config())
+    os.chmod(CONFIG_FILE, 0o644)
+    cfg = ConfigManager()
+    cfg.save_gesture("fist", [sample(1)])
+    cfg.close()
+    assert stat.S_IMODE(os.stat(CONFIG_FILE).st_mode) == 0o644
+    os.chmod(GESTURES_FILE, 0o640)
+    cfg = ConfigManager()
+    cfg.save_gesture("palm", [sample(2)])
+    cfg.close()
+    assert stat.S_IMODE(os.stat(GESTURES_FILE).st_mode) == 0o640
+
+@pytest.mark.parametrize("change", [{"threshold": "oops"}, {"hold_time": None}, {"knn_k": 2.5}, {"cascade": 1}])
+def test_reload_rejects_bad_settings(workdir, change):
+    write_config(base_config())
+    cfg = ConfigManager()
+    data = base_config()
+    data["settings"].update(change)
+    write_config(data)
+    with pytest.raises(ValueError):
+        cfg.reload()
+    assert cfg.config["settings"] == config_manager.DEFAULT_CONFIG["settings"]
+    cfg.close()
+
+def test_reload_fills_missing_setting(workdir):
+    write_config(base_config())
+    cfg = ConfigManager()
+    data = base_config()
+    del data["settings"]["hold_time"]
+    data["profiles"]["GLOBAL"]["actions"]["fist"] = "hotkey:ctrl+v"
+    write_config(data)
+    assert cfg.check_reload(now=10.0) is not None
+    assert cfg.config["settings"]["hold_time"] == 0.5
+    assert cfg.get_plan("fist").source == "hotkey:ctrl+v"
+    cfg.close()
+
+def test_reload_accepts_pre_series_config(workdir):
+    old = {"hold_time": 0.5, "threshold": 0.07, "frame_reduction": 100, "trackpad_sensitivity": 3.0, "trackpad_mode": False}
+    write_config({"profiles": {"GLOBAL": {"actions": {}}}, "gestures": {}, "settings": dict(old)})
+    cfg = ConfigManager()
+    write_config({"profiles": {"GLOBAL": {"actions": {}}}, "gestures": {}, "settings": dict(old, hold_time=0.8)})
+    assert cfg.check_reload(now=10.0)["settings"] == ["hold_time"]
+    assert cfg.config["settings"]["hold_time"] == 0.8
+    assert cfg.config["settings"]["knn_k"] == config_manager.DEFAULT_CONFIG["settings"]["knn_k"]
+    cfg.close()
+
+def test_reload_waits_for_flush_in_progress(workdir, monkeypatch):
+    write_config(base_config())
+    cfg = ConfigManager()
+    real_write, reloads = config_manager.atomic_write, []
+    def slow_write(path, write_fn, mode="wb"):
+        real_write(path, write_fn, mode)
+        if path == GESTURES_FILE:
+            t = threading.Thread(target=lambda: reloads.append(cfg.check_reload(now=10.0)))
+            t.start()
+            t.join(0.2)
+            reloads.append(t)
+    monkeypatch.setattr(config_manager, "atomic_write", slow_write)
+    cfg.save_gesture("palm", [sample(2)], "hotkey:ctrl+v")
+    cfg.flush()
+    reloads[0].join(1.0)
+    assert reloads[1:] == [None]
+    assert cfg.get_plan("palm").source == "hotkey:ctrl+v"
+    assert read_config()["profiles"]["GLOBAL"]["actions"]["palm"] == "hotkey:ctrl+v"
+    cfg.close()
+
+def test_startup_repairs_settings(workdir):
+    data = base_config()
+    del data["settings"]["hold_time"]
+    data["settings"]["threshold"] = "oops"
+    write_config(data)
+    cfg = ConfigManager()
+    assert cfg.config["settings"]["hold_time"] == 0.5
+    assert cfg.config["settings"]["threshold"] == 0.07
+    cfg.close()
+
+def test_reload_prefers_sidecar_over_legacy(workdir):
+    write_config(base_config())
+    cfg = ConfigManager()
+    cfg.save_gesture("fist", [sample(1)])
+    cfg.flush()
+    data = read_config()
+    data["gestures"] = {"fist": [sample(1).tolist()], "palm": [sample(2).tolist()]}
+    write_config(data)
+    cfg.reload()
+    assert len(cfg.config["gestures"]["fist"]) == 1
+    assert np.array_equal(cfg.config["gestures"]["fist"][0], sample(1))
+    assert "palm" in cfg.config["gestures"] and "palm" in cfg.bank.names
+    cfg.close()
+    assert "gestures" not in read_config()
+
+def test_read_only_does_not_touch_files(workdir):
+    data = base_config(gestures={"palm": [sample(2).tolist()]})
+    write_config(data)
+    before = os.stat(CONFIG_FILE).st_mtime_ns
+    cfg = ConfigManager(read_only=True)
+    assert "palm" in cfg.config["gestures"]
+    cfg.save_setting("threshold", 0.2)
+    cfg.close()
+    assert os.stat(CONFIG_FILE).st_mtime_ns == before
+    assert read_config() == data
+    assert not os.path.exists(GESTURES_FILE)
@@ -0,0 +1,79 @@
+import time
+
+import numpy as np
+import pytest
+
+from libs.cursor_filter import OneEuroFilter, CursorFilter
+from libs.input_backend import CursorMotion, RecordingBackend
+
+FPS = 30
+
+def run(f, values):
+    return np.array([f(v, i / FPS) for i, v in enumerate(values)])
+
+def test_converges_to_still_target():
+    out = run(OneEuroFilter(min_cutoff=1.0, beta=0.0), [0.0] + [100.0] * 60)
+    assert out[0] == 0.0
+    assert np.all(np.diff(out) >= 0)
+    assert out[-1] == pytest.approx(100.0, abs=0.5)
+
+def test_reduces_jitter_on_still_hand():
+    noisy = 500 + np.random.default_rng(0).normal(0, 4.0, 300)
+    out = run(OneEuroFilter(min_cutoff=1.0, beta=0.01), noisy)
+    assert np.std(np.diff(out[30:])) < 0.25 * np.std(np.diff(noisy[30:]))
+    assert abs(out[30:].mean() - 500) < 1.0
+
+def test_speed_raises_cutoff_and_cuts_lag():
+    ramp = np.arange(60) * 20.0
+    slow, fast = run(OneEuroFilter(beta=0.0), ramp), run(OneEuroFilter(beta=0.05), ramp)
+    assert ramp[-1] - fast[-1] < 0.5 * (ramp[-1] - slow[-1])
+
+def test_reset_and_repeated_timestamps():
+    f = OneEuroFilter()
+    run(f, [0.0] * 10 + [50.0] * 10)
+    assert f(80.0, 20 / FPS) == f.x
+    f.reset()
+    assert f(300.0, 100.0) == 300.0 and f.dx == 0.0
+    assert f(10.0, 100.0) == 300.0
+
+def test_prediction_leads_along_velocity():
+    plain, lead = CursorFilter(beta=0.0), CursorFilter(beta=0.0, prediction=1.0)
+    for i in range(20):
+        p = plain(i * 10.0, 0.0, i / FPS)
+        q = lead(i * 10.0, 0.0, i / FPS, latency=0.05)
+    assert q[0] > p[0] and q[1] == p[1] == 0.0
+
+def moves(backend):
+    return [args for _, event, args in backend.events if event == "move_rel"]
+
+def test_cursor_motion_without_thread_moves_directly():
+    backend = RecordingBackend()
+    CursorMotion(backend, rate=0).start().move_rel(3.5, -2)
+    assert moves(backend) == [(3.5, -2)]
+
+def test_cursor_motion_spreads_moves_without_losing_pixels():
+    backend = RecordingBackend()
+    cursor = CursorMotion(backend, rate=240).start()
+    try:
+        for _ in range(3):
+            cursor.move_rel(40.4, -20.2)
+            time.sleep(1 / FPS)
+        time.sleep(0.15)
+    finally:
+        cursor.stop()
+    steps = moves(backend)
+    assert len(steps) > 3
+    assert sum(dx for dx, _ in steps) == 121 and sum(dy for _, dy in steps) == -60
+    assert all(isinstance(dx, int) and isinstance(dy, int) for dx, dy in steps)
+
+def test_cursor_motion_flushes_before_button():
+    backend = RecordingBackend()
+    cursor = CursorMotion(backend, rate=240).start()
+    try:
+        cursor.move_rel(200, 0)
+        cursor.mouse_down()
+        events = [(e, a) for _, e, a in backend.events]
+    finally:
+        cursor.stop()
+    assert events[-1] == ("mouse_down", ())
+    assert sum(a[0] for e, a in events if e == "move_rel") == 200
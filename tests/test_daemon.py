@@ -0,0 +1,65 @@
+import json
+import socket
+import threading
+
+import pytest
+
+import libs.input_backend as input_backend
+from libs.daemon import ControlServer
+from libs.input_backend import RecordingBackend, make_backend
+
+@pytest.fixture
+def server(tmp_path):
+    srv = ControlServer(str(tmp_path / "api.sock"), {"echo": lambda req: {"echo": req.get("value")}}).start()
+    done = threading.Event()
+    def pump():
+        while not done.is_set():
+            srv.run_pending()
+            done.wait(0.01)
+    t = threading.Thread(target=pump, daemon=True)
+    t.start()
+    yield srv
+    done.set()
+    t.join()
+    srv.stop()
+
+def ask(srv, *lines):
+    with socket.socket(socket.AF_UNIX) as s:
+        s.connect(srv.path)
+        f = s.makefile("rw")
+        out = []
+        for line in lines:
+            f.write(line + "\n")
+            f.flush()
+            out.append(json.loads(f.readline()))
+        return out
+
+def test_command_roundtrip(server):
+    assert ask(server, '{"cmd": "echo", "value": 3}') == [{"ok": True, "echo": 3}]
+
+def test_bad_requests_keep_connection(server):
+    replies = ask(server, "not json", '"x"', "[1]", '{"cmd": "nope"}', '{"cmd": "echo", "value": 1}')
+    assert [r["ok"] for r in replies] == [False, False, False, False, True]
+    assert replies[-1]["echo"] == 1
+
+def test_subscribe_streams_events(server):
+    with socket.socket(socket.AF_UNIX) as s:
+        s.connect(server.path)
+        f = s.makefile("rw")
+        f.write('{"cmd": "subscribe"}\n')
+        f.flush()
+        assert json.loads(f.readline()) == {"ok": True}
+        while not server.bus.subscribers: pass
+        server.bus.publish("gesture", name="fist")
+        msg = json.loads(f.readline())
+        assert (msg["event"], msg["name"]) == ("gesture", "fist")
+
+def test_headless_backend_falls_back_to_recording(monkeypatch):
+    def no_display():
+        raise KeyError("DISPLAY")
+    monkeypatch.setattr(input_backend, "XlibBackend", no_display)
+    monkeypatch.setattr(input_backend, "PyAutoGuiBackend", no_display)
+    backend = make_backend("auto")
+    assert isinstance(backend, RecordingBackend)
+    with pytest.raises(KeyError):
+        make_backend("pyautogui")
@@ -0,0 +1,82 @@
+import threading
+import types
+
+from libs.events import EventBus, UiDispatcher
+
+def test_bus_dispatches_in_post_order():
+    seen, done = [], threading.Event()
+    bus = EventBus()
+    bus.on("n", seen.append).on("done", lambda _: done.set())
+    bus.start()
+    for i in range(50): bus.post("n", i)
+    bus.post("done")
+    assert done.wait(2)
+    assert seen == list(range(50))
+    bus.stop()
+    bus.join(2)
+
+def test_bus_survives_handler_errors(capsys):
+    seen, done = [], threading.Event()
+    bus = EventBus()
+    bus.on("n", lambda i: 1 / i).on("n", seen.append).on("done", lambda _: done.set())
+    bus.start()
+    for i in (0, 1): bus.post("n", i)
+    bus.post("done")
+    assert done.wait(2)
+    assert seen == [0, 1] and bus.errors == 1
+    assert "!!!" in capsys.readouterr().out
+    bus.stop()
+    bus.join(2)
+
+def test_bus_stop_runs_stop_handlers_and_ignores_later_posts():
+    seen, stopped = [], threading.Event()
+    bus = EventBus()
+    bus.on("n", seen.append).on("stop", lambda _: stopped.set())
+    bus.start()
+    bus.post("n", 1)
+    bus.stop()
+    assert stopped.wait(2)
+    bus.join(2)
+    assert not bus.thread.is_alive() and not bus.running
+    bus.post("n", 2)
+    assert seen == [1]
+
+class FakeRoot:
+    def __init__(self, threaded):
+        self.tk = types.SimpleNamespace(eval=lambda cmd: "1" if threaded else "0")
+        self.pending = []
+
+    def after(self, ms, fn, *args):
+        self.pending.append((fn, args))
+
+    def run_pending(self):
+        pending, self.pending = self.pending, []
+        for fn, args in pending: fn(*args)
+
+def test_dispatcher_polls_in_order_when_tk_is_not_threaded():
+    root, seen = FakeRoot(threaded=False), []
+    ui = UiDispatcher(root)
+    for i in range(3): ui.post(seen.append, i)
+    assert seen == []
+    root.run_pending()
+    assert seen == [0, 1, 2]
+    assert len(root.pending) == 1
+
+def test_dispatcher_keeps_polling_after_callback_error(capsys):
+    root, seen = FakeRoot(threaded=False), []
+    ui = UiDispatcher(root)
+    ui.post(lambda: 1 / 0)
+    ui.post(seen.append, "next")
+    root.run_pending()
+    ui.post(seen.append, "later")
+    root.run_pending()
+    assert seen == ["next", "later"]
+    assert "!!!" in capsys.readouterr().out
+
+def test_dispatcher_uses_after_when_tk_is_threaded():
+    root, seen = FakeRoot(threaded=True), []
+    ui = UiDispatcher(root)
+    assert root.pending == []
+    ui.post(seen.append, 1)
+    root.run_pending()
+    assert seen == [1]
@@ -0,0 +1,20 @@
+import numpy as np
+import pytest
+
+from libs.idle import IdleGate
+
+def test_wake_latency_spans_idle_sample_to_full_rate_frame():
+    gate = IdleGate(idle_after=5.0, idle_fps=5)
+    still = np.zeros((48, 64, 3), dtype=np.uint8)
+    moved = still.copy()
+    moved[:, :32] = 255
+    assert not gate.observe(False, 0.0)
+    assert gate.observe(False, 6.0) and gate.idle
+    assert not gate.check(still, 6.2)
+    assert not gate.check(still, 6.4)
+    assert gate.check(moved, 6.6) and not gate.idle
+    gate.observe(False, 6.6)
+    assert gate.wake_latencies == []
+    gate.observe(True, 6.65)
+    assert gate.wake_latencies == [pytest.approx(0.25)]
+    assert gate.wakeups == 1
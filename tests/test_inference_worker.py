@@ -0,0 +1,29 @@
+import time
+
+import numpy as np
+import pytest
+
+from libs.gesture_engine import GestureEngine
+from libs.inference_worker import InferenceWorker
+
+def test_worker_dying_at_startup_raises_quickly():
+    worker = InferenceWorker(1, start_timeout=30.0, no_such_option=True)
+    t0 = time.monotonic()
+    with pytest.raises(RuntimeError, match="при запуске"):
+        worker.start((48, 64, 3))
+    assert time.monotonic() - t0 < 20.0
+    assert worker.proc is None
+
+class DeadWorker:
+    def __init__(self):
+        self.stopped = False
+    def process_frame(self, frame):
+        raise RuntimeError("процесс распознавания завершился")
+    def stop(self):
+        self.stopped = True
+
+def test_engine_falls_back_when_worker_dies():
+    worker = DeadWorker()
+    engine = GestureEngine(load_model=False, worker=worker)
+    assert engine.process_frame(np.zeros((48, 64, 3), dtype=np.uint8)) is None
+    assert worker.stopped and engine.worker is None
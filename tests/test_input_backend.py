@@ -0,0 +1,87 @@
+import pytest
+
+import libs.action_handler as action_handler
+from libs.action_handler import ActionHandler
+from libs.action_plan import compile_action
+from libs.input_backend import RecordingBackend, XlibBackend, X_KEYS, x_keysym
+
+@pytest.fixture
+def handler(monkeypatch):
+    monkeypatch.setattr(action_handler.time, "sleep", lambda s: None)
+    monkeypatch.setattr(action_handler.pyperclip, "copy", lambda text: None)
+    return ActionHandler(RecordingBackend())
+
+def recorded(handler):
+    return [(event, args) for _, event, args in handler.input.events]
+
+def test_hotkey_plan(handler):
+    handler.execute(compile_action("hotkey:Ctrl+Shift+T"))
+    assert recorded(handler) == [("hotkey", ("ctrl", "shift", "t"))]
+
+def test_chain_plan_runs_in_order(handler):
+    handler.execute(compile_action("chain:hotkey:alt+f4 | mouse:double | wait:0 | mouse:right | paste:hi"))
+    assert recorded(handler) == [
+        ("hotkey", ("alt", "f4")),
+        ("click", ("left", 2)),
+        ("click", ("right", 1)),
+        ("key_down", ("ctrl",)),
+        ("press", ("v",)),
+        ("key_up", ("ctrl",)),
+    ]
+
+def test_invalid_plan_sends_nothing(handler):
+    handler.execute("chain:hotkey:ctrl+c|mouse:sideways")
+    assert recorded(handler) == []
+
+@pytest.mark.parametrize("key", ["f5", "F5", "f12", "+", ",", "printscreen", "pgup", "pgdn", "capslock",
+                                 "ctrl", "alt", "win", "volumeup", "a", "A", "1"])
+def test_hotkey_keys_resolve(key):
+    pytest.importorskip("Xlib")
+    assert x_keysym(key)
+
+def test_all_mapped_keys_resolve():
+    pytest.importorskip("Xlib")
+    assert [k for k in X_KEYS if not x_keysym(k)] == []
+
+def test_unknown_key():
+    pytest.importorskip("Xlib")
+    assert x_keysym("nosuchkey") == 0
+
+class FakeDisplay:
+    def keysym_to_keycode(self, sym):
+        return sym & 0xFF
+
+def xlib_backend(events):
+    X = pytest.importorskip("Xlib.X")
+    backend = XlibBackend.__new__(XlibBackend)
+    backend.X = X
+    backend.d = FakeDisplay()
+    backend._fake = lambda event, detail=0, x=0, y=0: events.append((event, detail))
+    return backend
+
+def test_xlib_hotkey_releases_in_reverse():
+    events = []
+    backend = xlib_backend(events)
+    backend.hotkey("ctrl", "f5")
+    X = backend.X
+    ctrl, f5 = backend._keycode("ctrl"), backend._keycode("f5")
+    assert events == [(X.KeyPress, ctrl), (X.KeyPress, f5), (X.KeyRelease, f5), (X.KeyRelease, ctrl)]
+
+def test_xlib_hotkey_unknown_key_presses_nothing():
+    events = []
+    backend = xlib_backend(events)
+    with pytest.raises(ValueError):
+        backend.hotkey("ctrl", "shift", "nosuchkey")
+    assert events == []
+
+def test_xlib_hotkey_releases_after_failed_press():
+    events = []
+    backend = xlib_backend(events)
+    X = backend.X
+    def fake(event, detail=0, x=0, y=0):
+        if event == X.KeyPress and len(events) == 1: raise OSError("connection lost")
+        events.append((event, detail))
+    backend._fake = fake
+    with pytest.raises(OSError):
+        backend.hotkey("ctrl", "c")
+    assert events == [(X.KeyPress, backend._keycode("ctrl")), (X.KeyRelease, backend._keycode("ctrl"))]
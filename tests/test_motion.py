@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from libs.motion import MotionBank, MOTION_LEN, resample
+
+def reference_dtw(a, b, band):
+    n = len(a)
+    D = np.full((n + 1, n + 1), np.inf)
+    D[0, 0] = 0.0
+    for i in range(1, n + 1):
+        for j in range(max(1, i - band), min(n, i + band) + 1):
+            cost = np.hypot(*(a[i - 1] - b[j - 1]))
+            D[i, j] = cost + min(D[i - 1, j - 1], D[i - 1, j], D[i, j - 1])
+    return D[n, n] / (2 * n)
+
+def stroke(rng, base=None, noise=0.0):
+    if base is None:
+        angles = np.cumsum(rng.uniform(-0.6, 0.6, MOTION_LEN))
+        steps = np.stack([np.cos(angles), np.sin(angles)], axis=1) * rng.uniform(0.1, 0.3)
+        base = np.cumsum(steps, axis=0)
+    return resample(base + rng.normal(0, noise, base.shape))
+
+def library(seed, n, families=4):
+    rng = np.random.default_rng(seed)
+    bases = [stroke(rng) for _ in range(families)]
+    motions = {f"m{i:02d}": stroke(rng, bases[i % families], 0.08) for i in range(n)}
+    return rng, bases, motions
+
+@pytest.mark.parametrize("seed", range(5))
+def test_banded_dtw_matches_reference(seed):
+    rng, bases, motions = library(seed, 12)
+    bank = MotionBank(motions)
+    query = stroke(rng, bases[0], 0.05)
+    totals = bank._dtw(query, np.arange(len(bank)), np.inf) / (2 * MOTION_LEN)
+    expected = [reference_dtw(query, bank.data[i], bank.band) for i in range(len(bank))]
+    assert np.allclose(totals, expected, rtol=1e-4, atol=1e-5)
+
+@pytest.mark.parametrize("seed", range(10))
+def test_lower_bound_never_exceeds_dtw(seed):
+    rng, bases, motions = library(seed, 20)
+    bank = MotionBank(motions)
+    query = stroke(rng, bases[seed % 4], 0.1)
+    exact = np.array([reference_dtw(query, bank.data[i], bank.band) for i in range(len(bank))]) * 2 * MOTION_LEN
+    assert (bank.lower_bounds(query) <= exact + 1e-4).all()
+
+@pytest.mark.parametrize("seed", range(10))
+def test_pruning_keeps_best_match(seed):
+    rng, bases, motions = library(seed, 40)
+    bank = MotionBank(motions)
+    query = stroke(rng, bases[seed % 4], 0.05)
+    exact = [reference_dtw(query, bank.data[i], bank.band) for i in range(len(bank))]
+    best = int(np.argmin(exact))
+    for threshold in (exact[best] * 1.01, 0.5, 10.0):
+        name, dist = bank.match(query, threshold)
+        assert name == bank.names[best]
+        assert dist == pytest.approx(exact[best], rel=1e-4)
+    assert bank.match(query, exact[best] * 0.99)[0] is None
+
+@pytest.mark.parametrize("seed", range(10))
+def test_best_match_beyond_first_candidate_batch(seed):
+    rng, bases, motions = library(seed, 80, families=2)
+    bank = MotionBank(motions)
+    query = stroke(rng, bases[0], 0.1)
+    exact = bank._dtw(query, np.arange(len(bank)), np.inf) / (2 * MOTION_LEN)
+    name, dist = bank.match(query, 10.0)
+    assert name == bank.names[int(np.argmin(exact))]
+    assert dist == pytest.approx(float(exact.min()), rel=1e-5)
+
+def test_short_travel_is_ignored():
+    _, _, motions = library(0, 4)
+    bank = MotionBank(motions)
+    assert bank.match(np.zeros((MOTION_LEN, 2), dtype=np.float32), 10.0) == (None, float("inf"))
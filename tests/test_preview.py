@@ -0,0 +1,26 @@
+import threading
+import time
+
+import numpy as np
+
+from libs import preview as preview_mod
+from libs.preview import PreviewRenderer
+
+def test_highgui_stays_on_calling_thread(monkeypatch):
+    calls = []
+    for name in ("namedWindow", "resizeWindow", "imshow", "waitKey", "destroyWindow"):
+        monkeypatch.setattr(preview_mod.cv2, name, lambda *a, name=name: calls.append((name, threading.current_thread())))
+    renderer = PreviewRenderer(None, (255, 255, 255), fps=0).start()
+    try:
+        assert calls == []
+        renderer.submit(np.zeros((120, 160, 3), dtype=np.uint8), stats_txt="fps 30")
+        deadline = time.monotonic() + 2.0
+        while renderer.rendered == 0 and time.monotonic() < deadline: time.sleep(0.01)
+        assert renderer.rendered == 1 and calls == []
+        renderer.present()
+        renderer.present()
+    finally:
+        renderer.stop()
+    names = [name for name, _ in calls]
+    assert names.count("imshow") == 1 and "destroyWindow" in names
+    assert all(thread is threading.current_thread() for _, thread in calls)
@@ -0,0 +1,35 @@
+import json
+
+import numpy as np
+
+import libs.config_manager as config_manager
+from libs.config_manager import ConfigManager, CONFIG_FILE
+from libs.gesture_engine import GestureEngine
+from libs.recording import LandmarkRecorder, Point, Hand
+from libs.replay import compare_flow
+
+def moving_hand(pose, dx):
+    return Hand([Point(float(x) + dx, float(y), 0.0) for x, y in pose])
+
+def test_flow_compare_matches_model_on_slow_motion(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config_manager, "SAVE_DEBOUNCE", 0.0)
+    settings = dict(config_manager.DEFAULT_CONFIG["settings"], flow_tracking=True)
+    with open(CONFIG_FILE, "w", encoding="utf-8") as f:
+        json.dump({"profiles": {"GLOBAL": {"actions": {"open": "hotkey:ctrl+c"}}}, "settings": settings}, f)
+    pose = np.random.default_rng(3).uniform(0.35, 0.6, (21, 2))
+    cfg = ConfigManager()
+    cfg.save_gesture("open", [GestureEngine(load_model=False).normalize_landmarks(moving_hand(pose, 0.0).landmark).tolist()])
+    cfg.close()
+
+    recorder = LandmarkRecorder("rec.bin")
+    for i in range(30):
+        recorder.write(i / 30, 640, 480, "Editor", [moving_hand(pose, 0.002 * i)], ["Right"])
+    recorder.write(1.0, 640, 480, "Editor", [])
+    recorder.close()
+
+    report = compare_flow("rec.bin")
+    assert report["frames"] == 31 and report["hand_frames"] == 30
+    assert report["tracked"] > 0 and report["model_call_ratio"] < 1.0
+    assert report["agreement"] == 1.0
+    assert report["landmark_error_px"] < 2.0
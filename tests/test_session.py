@@ -0,0 +1,93 @@
+import json
+
+import numpy as np
+import pytest
+
+import libs.config_manager as config_manager
+from libs.config_manager import ConfigManager, CONFIG_FILE
+from libs.gesture_engine import GestureEngine
+from libs.recording import Point, Hand
+from libs.session import GestureSession, COMBO_SEP
+
+def pose(seed):
+    pts = np.random.default_rng(seed).uniform(0.0, 0.2, (21, 2))
+    pts[4] = pts[8] + 0.1
+    return pts
+
+POSES = {"fist": pose(1), "palm": pose(2)}
+
+def hand(name, dx=0.0, at=(0.3, 0.3)):
+    return Hand([Point(float(x) + at[0] + dx, float(y) + at[1], 0.0) for x, y in POSES[name]])
+
+class Executor:
+    def __init__(self):
+        self.fired = []
+    def submit(self, plan, tag=None, replace=True):
+        self.fired.append(tag)
+        return True
+
+class Mouse:
+    def __init__(self):
+        self.moves = []
+    def move_rel(self, dx, dy): self.moves.append((dx, dy))
+    def mouse_down(self): pass
+    def mouse_up(self): pass
+
+@pytest.fixture
+def session(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config_manager, "SAVE_DEBOUNCE", 0.0)
+    actions = {"fist": "hotkey:ctrl+c", "palm": "hotkey:ctrl+v", f"fist{COMBO_SEP}palm": "hotkey:ctrl+z"}
+    with open(CONFIG_FILE, "w", encoding="utf-8") as f:
+        json.dump({"profiles": {"GLOBAL": {"actions": actions}},
+                   "settings": dict(config_manager.DEFAULT_CONFIG["settings"], cursor_hand="Right")}, f)
+    cfg = ConfigManager(read_only=True)
+    engine = GestureEngine(load_model=False, max_hands=2)
+    for name, pts in POSES.items():
+        cfg.bank.add(name, [engine.normalize_landmarks(hand(name).landmark).copy()])
+    s = GestureSession(engine, cfg, Executor(), Mouse())
+    yield s
+    cfg.close()
+
+def hold(session, hands, labels, frames=20, step=0.05, move=None, start=0.0):
+    out = None
+    for i in range(frames):
+        current = move(i) if move else hands
+        out = session.step(current, 640, 480, "Editor", start + i * step, labels)
+    return out
+
+def test_two_hand_combo_fires_combo_action(session):
+    out = hold(session, [hand("fist"), hand("palm", at=(0.6, 0.3))], ["Left", "Right"])
+    assert out.gesture == f"fist{COMBO_SEP}palm"
+    assert session.executor.fired == [f"fist{COMBO_SEP}palm"]
+
+def test_combo_needs_both_labels_and_a_plan(session):
+    out = hold(session, [hand("palm"), hand("fist", at=(0.6, 0.3))], ["Left", "Right"])
+    assert out.gesture == "palm"
+    session.executor.fired.clear()
+    out = hold(session, [hand("fist"), hand("palm", at=(0.6, 0.3))], ["Right", "Right"])
+    assert out.gesture == "fist"
+
+def test_single_hand_falls_back_to_its_gesture(session):
+    out = hold(session, [hand("palm")], ["Left"])
+    assert out.gesture == "palm" and session.executor.fired == ["palm"]
+
+def test_cursor_hand_drives_cursor_while_other_hand_gestures(session):
+    session.is_following = True
+    move_right = lambda i: [hand("fist"), hand("palm", dx=0.01 * i, at=(0.6, 0.3))]
+    out = hold(session, None, ["Left", "Right"], move=move_right)
+    assert out.gesture == "fist"
+    assert out.cursor[0] == int((POSES["palm"][8][0] + 0.6 + 0.19) * 640)
+    assert sum(dx for dx, _ in session.mouse.moves) > 0
+
+    still = [hand("fist"), hand("palm", dx=0.19, at=(0.6, 0.3))]
+    hold(session, still, ["Left", "Right"], frames=60, start=1.0)
+    session.mouse.moves.clear()
+    move_left = lambda i: [hand("fist", dx=0.01 * i), hand("palm", dx=0.19, at=(0.6, 0.3))]
+    hold(session, None, ["Left", "Right"], move=move_left, start=4.0)
+    assert session.mouse.moves == []
+
+def test_without_cursor_hand_the_first_hand_drives(session):
+    session.is_following = True
+    hold(session, None, ["Left"], move=lambda i: [hand("palm", dx=0.01 * i)])
+    assert sum(dx for dx, _ in session.mouse.moves) > 0
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from libs.template_bank import TemplateBank
+
+def library(n, seed=0):
+    rng = np.random.default_rng(seed)
+    protos = rng.uniform(-1, 1, (n, 21, 2)).astype(np.float32)
+    protos[:, 0] = 0
+    return rng, protos, {f"g{i}": protos[i] for i in range(n)}
+
+@pytest.mark.parametrize("n", [600, 5000])
+def test_cascade_matches_full_search(n):
+    rng, protos, gestures = library(n)
+    bank = TemplateBank(gestures)
+    queries = protos[rng.integers(0, n, 200)] + rng.normal(0, 0.02, (200, 21, 2)).astype(np.float32)
+    queries[::4] = rng.uniform(-1, 1, (50, 21, 2))
+    limits = [{"g1": 0.2} if i % 7 == 0 else None for i in range(len(queries))]
+    bank.cascade = False
+    full = [bank.classify(q, 5, 0.07, t) for q, t in zip(queries, limits)]
+    bank.cascade = True
+    pruned = [bank.classify(q, 5, 0.07, t) for q, t in zip(queries, limits)]
+    assert [r[0] for r in pruned] == [r[0] for r in full]
+    assert all(p[1] == f[1] for p, f in zip(pruned, full) if f[0] is not None)
+    assert sum(r[0] is not None for r in full) > 100
+    assert bank.pruning_ratio() > 0.5
+
+def test_remove_keeps_cascade_rows_aligned():
+    rng, protos, gestures = library(700, seed=1)
+    bank = TemplateBank(gestures)
+    for i in range(0, 700, 3): bank.remove(f"g{i}")
+    bank.add("extra", protos[0])
+    assert bank.classify(protos[0], 5, 0.07)[0] == "extra"
+    assert bank.classify(protos[1], 5, 0.07)[0] == "g1"
+    assert bank.classify(protos[3], 5, 0.07)[0] is None
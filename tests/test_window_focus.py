@@ -0,0 +1,54 @@
+import threading
+
+from libs.window_focus import WindowFocus, FakeWindowBackend
+
+class BrokenBackend:
+    def active_title(self):
+        raise OSError("no display")
+
+def test_refresh_notifies_only_on_change():
+    backend = FakeWindowBackend("Editor")
+    focus = WindowFocus(backend)
+    seen = []
+    focus.listeners.append(seen.append)
+    assert focus.refresh() == "Editor"
+    assert focus.refresh() == "Editor"
+    backend.set_title(None)
+    assert focus.refresh() == "GLOBAL"
+    assert seen == ["Editor", "GLOBAL"]
+
+def test_listener_errors_and_backend_errors_keep_last_title(capsys):
+    focus = WindowFocus(FakeWindowBackend("Browser"))
+    focus.listeners.append(lambda title: 1 / 0)
+    assert focus.refresh() == "Browser"
+    assert "[Focus]" in capsys.readouterr().out
+    focus.backend = BrokenBackend()
+    assert focus.refresh() == "Browser" and focus.title == "Browser"
+
+def test_background_thread_follows_title_changes():
+    backend = FakeWindowBackend("Editor")
+    focus = WindowFocus(backend, rate=0.5).start()
+    try:
+        assert focus.title == "Editor"
+        changed = threading.Event()
+        focus.listeners.append(lambda title: changed.set())
+        backend.set_title("Terminal")
+        assert changed.wait(1.0)
+        assert focus.title == "Terminal"
+    finally:
+        focus.stop()
+    assert not focus.thread.is_alive()
+
+def test_without_backend_stays_global():
+    focus = WindowFocus(backend=None)
+    focus.backend = None
+    assert focus.start().thread is None and focus.title == "GLOBAL"
+
+class PollingBackend:
+    def active_title(self):
+        return "Editor"
+
+def test_stop_does_not_wait_for_the_poll_interval():
+    focus = WindowFocus(PollingBackend(), rate=0.2).start()
+    focus.stop()
+    assert not focus.thread.is_alive()